@@ -0,0 +1,144 @@
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.models import DELETION, LogEntry
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.contrib.contenttypes.models import ContentType
+from django.template.response import TemplateResponse
+
+from . import bulk
+
+
+class BulkFieldForm(forms.Form):
+    def __init__(self, *args, field, admin_site, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['value'] = forms.ModelChoiceField(
+            queryset=field.remote_field.model._default_manager.all(),
+            label=field.verbose_name,
+            widget=AutocompleteSelect(field, admin_site),
+        )
+
+
+def _confirmation(modeladmin, request, queryset, title, template,
+                  **context):
+    opts = modeladmin.model._meta
+    return TemplateResponse(request, template, {
+        **modeladmin.admin_site.each_context(request),
+        'title': title,
+        'opts': opts,
+        'action': request.POST['action'],
+        'select_across': request.POST.get('select_across', '0'),
+        'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+        'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        'selected_count': queryset.count(),
+        **context,
+    })
+
+
+def _report(modeladmin, request, verb, count):
+    modeladmin.message_user(
+        request,
+        f'{verb}: {count} ({modeladmin.model._meta.verbose_name_plural})',
+        messages.SUCCESS,
+    )
+
+
+def _set_field_action(name, field_name, description, update):
+    # Действие с промежуточной формой выбора значения: «Перенести в
+    # категорию», «Сменить автора». Форма отправляется на тот же адрес
+    # списка, поэтому фильтры и выбор «всех» сохраняются.
+    def action(modeladmin, request, queryset):
+        field = modeladmin.model._meta.get_field(field_name)
+        form = BulkFieldForm(
+            request.POST if 'apply' in request.POST else None,
+            field=field, admin_site=modeladmin.admin_site)
+        if form.is_valid():
+            value = form.cleaned_data['value']
+            count = update(queryset, **{field_name: value})
+            _report(modeladmin, request, 'Изменено', count)
+            return None
+        return _confirmation(
+            modeladmin, request, queryset, description,
+            'admin/blog/bulk_field_form.html',
+            form=form, media=modeladmin.media + form.media)
+
+    action.__name__ = name
+    return admin.action(
+        description=description, permissions=['change'])(action)
+
+
+def _publish_action(name, is_published, description, update):
+    def action(modeladmin, request, queryset):
+        count = update(queryset, is_published=is_published)
+        _report(modeladmin, request, 'Изменено', count)
+
+    action.__name__ = name
+    return admin.action(
+        description=description, permissions=['change'])(action)
+
+
+def _deletion_log(modeladmin, request):
+    # Как log_deletion стандартного delete_selected, но одной вставкой
+    # записей журнала на пачку.
+    model = modeladmin.model
+    content_type = ContentType.objects.get_for_model(
+        model, for_concrete_model=False)
+
+    def log(ids):
+        LogEntry.objects.bulk_create([
+            LogEntry(
+                user_id=request.user.pk,
+                content_type_id=content_type.pk,
+                object_id=str(obj.pk),
+                object_repr=str(obj)[:200],
+                action_flag=DELETION,
+            )
+            for obj in model.objects.filter(id__in=ids)
+        ])
+
+    return log
+
+
+def _delete_action(delete):
+    @admin.action(description='Удалить выбранные (одним запросом)',
+                  permissions=['delete'])
+    def delete_selected(modeladmin, request, queryset):
+        if 'apply' in request.POST:
+            count = delete(
+                queryset, log=_deletion_log(modeladmin, request))
+            _report(modeladmin, request, 'Удалено', count)
+            return None
+        return _confirmation(
+            modeladmin, request, queryset, 'Подтверждение удаления',
+            'admin/blog/bulk_delete_confirmation.html',
+            preview=bulk.delete_preview(queryset))
+
+    return delete_selected
+
+
+publish_posts = _publish_action(
+    'publish_posts', True, 'Опубликовать', bulk.update_posts)
+unpublish_posts = _publish_action(
+    'unpublish_posts', False, 'Снять с публикации', bulk.update_posts)
+move_posts_to_category = _set_field_action(
+    'move_posts_to_category', 'category', 'Перенести в категорию',
+    bulk.update_posts)
+reassign_post_author = _set_field_action(
+    'reassign_post_author', 'author', 'Сменить автора', bulk.update_posts)
+delete_posts = _delete_action(bulk.delete_posts)
+
+publish_related = _publish_action(
+    'publish_related', True, 'Опубликовать', bulk.update_related)
+unpublish_related = _publish_action(
+    'unpublish_related', False, 'Снять с публикации', bulk.update_related)
+delete_related = _delete_action(bulk.delete_related)
+
+reassign_comment_author = _set_field_action(
+    'reassign_comment_author', 'author', 'Сменить автора',
+    bulk.update_comments)
+delete_comments = _delete_action(bulk.delete_comments)
+
+POST_ACTIONS = (publish_posts, unpublish_posts, move_posts_to_category,
+                reassign_post_author, delete_posts)
+RELATED_ACTIONS = (publish_related, unpublish_related, delete_related)
+COMMENT_ACTIONS = (reassign_comment_author, delete_comments)
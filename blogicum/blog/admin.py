@@ -1,5 +1,76 @@
+from django import forms
 from django.contrib import admin
-from .models import Category, Location, Post, Comment
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.utils.translation import gettext_lazy as _
+
+from .actions import COMMENT_ACTIONS, POST_ACTIONS, RELATED_ACTIONS
+from .changelist import KeysetAdminMixin
+from .models import Category, Location, Post, Comment, ImageJob
+from .search import get_search_backend
+
+
+class AutocompleteFilter(admin.RelatedFieldListFilter):
+    # Вместо списка всех связанных объектов — поле autocomplete админки:
+    # варианты подгружаются по AJAX, из базы читается только выбранный.
+    template = 'admin/blog/autocomplete_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin,
+                 field_path):
+        self.admin_site = model_admin.admin_site
+        super().__init__(
+            field, request, params, model, model_admin, field_path)
+
+    def has_output(self):
+        return True
+
+    def field_choices(self, field, request, model_admin):
+        return []
+
+    def widget(self):
+        # ModelChoiceField передаёт виджету queryset, по которому тот
+        # подписывает выбранное значение.
+        return forms.ModelChoiceField(
+            queryset=self.field.remote_field.model._default_manager.all(),
+            required=False,
+            widget=AutocompleteSelect(
+                self.field, self.admin_site, attrs={'data-width': '100%'}),
+        ).widget
+
+    def choices(self, changelist):
+        clear = changelist.get_query_string(
+            remove=[self.lookup_kwarg, self.lookup_kwarg_isnull])
+        yield {
+            'selected': self.lookup_val is None and not self.lookup_val_isnull,
+            'query_string': clear,
+            'display': _('All'),
+        }
+        yield {
+            'query_string': clear,
+            'lookup_kwarg': self.lookup_kwarg,
+            'widget': self.widget().render(
+                self.lookup_kwarg, self.lookup_val,
+                attrs={'id': f'id_filter_{self.lookup_kwarg}'}),
+        }
+        if self.include_empty_choice:
+            yield {
+                'selected': bool(self.lookup_val_isnull),
+                'query_string': changelist.get_query_string(
+                    {self.lookup_kwarg_isnull: 'True'}, [self.lookup_kwarg]),
+                'display': self.empty_value_display,
+            }
+
+
+class AutocompleteFilterMixin:
+    @property
+    def media(self):
+        media = super().media
+        for list_filter in self.list_filter:
+            if (isinstance(list_filter, tuple)
+                    and issubclass(list_filter[1], AutocompleteFilter)):
+                field = self.model._meta.get_field(list_filter[0])
+                return media + AutocompleteSelect(
+                    field, self.admin_site).media
+        return media
 
 
 class CategoryAdmin(admin.ModelAdmin):
@@ -11,6 +82,7 @@ class CategoryAdmin(admin.ModelAdmin):
     list_editable = ('is_published',)
     list_filter = ('is_published', 'created_at')
     search_fields = ('title', 'description')
+    actions = RELATED_ACTIONS
     prepopulated_fields = {'slug': ('title',)}
 
 
@@ -23,9 +95,10 @@ class LocationAdmin(admin.ModelAdmin):
     list_editable = ('is_published',)
     list_filter = ('is_published', 'created_at')
     search_fields = ('name',)
+    actions = RELATED_ACTIONS
 
 
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(KeysetAdminMixin, AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = (
         'title',
         'pub_date',
@@ -37,28 +110,63 @@ class PostAdmin(admin.ModelAdmin):
     list_editable = ('is_published',)
     list_filter = (
         'is_published',
-        'category',
-        'location',
+        ('category', AutocompleteFilter),
+        ('location', AutocompleteFilter),
         'pub_date'
     )
+    list_select_related = ('author', 'category', 'location')
+    autocomplete_fields = ('author', 'category', 'location')
     search_fields = ('title', 'text')
     date_hierarchy = 'pub_date'
-    ordering = ('-pub_date',)
+    ordering = ('-pub_date', '-id')
+    keyset_fields = ('pub_date', 'id')
+    actions = POST_ACTIONS
+
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск по индексу вместо LIKE '%q%' по title и text.
+        if not search_term:
+            return queryset, False
+        return get_search_backend().filter(queryset, search_term), False
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(KeysetAdminMixin, AutocompleteFilterMixin,
+                   admin.ModelAdmin):
     list_display = (
         'text',
         'author',
         'post',
         'created_at',
     )
-    list_filter = ('created_at', 'author', 'post')
+    list_filter = (
+        'created_at',
+        ('author', AutocompleteFilter),
+        ('post', AutocompleteFilter),
+    )
+    list_select_related = ('author', 'post')
+    autocomplete_fields = ('author', 'post')
     search_fields = ('text',)
     date_hierarchy = 'created_at'
+    ordering = ('-created_at', '-id')
+    keyset_fields = ('created_at', 'id')
+    actions = COMMENT_ACTIONS
+
+
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'image_name',
+        'post',
+        'status',
+        'attempts',
+        'updated_at',
+    )
+    list_filter = ('status',)
+    list_select_related = ('post',)
+    readonly_fields = ('post', 'image_name', 'claimed_by', 'attempts',
+                       'error')
 
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Location, LocationAdmin)
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(ImageJob, ImageJobAdmin)
@@ -0,0 +1,228 @@
+import hashlib
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.decorators import method_decorator
+from django.utils.http import http_date
+from django.views import View
+from django.views.decorators.gzip import gzip_page
+
+from . import scheduler
+from .cache import changed_within_lag, get_tag_versions, tag_version_time
+from .models import Category, Comment, Post, User
+from .paginators import KeysetPaginator
+from .routers import use_primary
+from .views import get_posts_with_filters
+
+API_PAGE_SIZE = getattr(settings, 'BLOG_API_PAGE_SIZE', 20)
+API_MAX_PAGE_SIZE = getattr(settings, 'BLOG_API_MAX_PAGE_SIZE', 100)
+API_MAX_AGE = getattr(settings, 'BLOG_API_MAX_AGE', 0)
+
+# Имя поля в ответе и столбец для .values(): связанные объекты
+# отдаются одним значением, без загрузки моделей.
+POST_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'updated_at': 'updated_at',
+    'author': 'author__username',
+    'category': 'category__slug',
+    'location': 'location__name',
+    'image': 'image',
+    'comment_count': 'comment_count',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'author': 'author__username',
+    'created_at': 'created_at',
+}
+KEY_FIELDS = ('pub_date', 'id')
+
+
+class ApiError(Exception):
+    pass
+
+
+def select_fields(value, available):
+    if not value:
+        return list(available)
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        raise ApiError(f'Неизвестные поля: {", ".join(unknown)}')
+    return fields
+
+
+def page_size(value):
+    if not value:
+        return API_PAGE_SIZE
+    try:
+        size = int(value)
+    except ValueError:
+        raise ApiError('limit должен быть числом')
+    return min(max(size, 1), API_MAX_PAGE_SIZE)
+
+
+def serialize(rows, fields, columns):
+    image_storage = Post._meta.get_field('image').storage
+    result = []
+    for row in rows:
+        item = {name: row[columns[name]] for name in fields}
+        if 'image' in item:
+            item['image'] = (
+                image_storage.url(item['image']) if item['image'] else None)
+        result.append(item)
+    return result
+
+
+def page_url(request, **cursor):
+    params = request.GET.copy()
+    for name in ('after', 'before'):
+        params.pop(name, None)
+    params.update(cursor)
+    return f'{request.path}?{params.urlencode()}'
+
+
+@method_decorator(gzip_page, name='dispatch')
+class ApiView(View):
+    # Валидаторы ответа строятся по версиям тегов кэша страниц
+    # (blog/cache.py): их сбрасывают те же сигналы, что и HTML-страницы,
+    # поэтому 304 отдаётся без запросов к базе.
+    http_method_names = ['get', 'head', 'options']
+    read_from_replica = True
+
+    def get_cache_tags(self):
+        return []
+
+    def get_data(self, fields):
+        raise NotImplementedError
+
+    def validators(self):
+        scheduler.release_if_due()
+        versions = get_tag_versions(self.get_cache_tags())
+        if changed_within_lag(versions):
+            # ETag с новыми версиями не должен закрепить у клиента
+            # данные отстающей реплики.
+            use_primary()
+        digest = hashlib.md5(self.request.get_full_path().encode())
+        for tag in sorted(versions):
+            digest.update(f'{tag}={versions[tag]};'.encode())
+        times = [
+            stamp for stamp in map(tag_version_time, versions.values())
+            if stamp is not None
+        ]
+        return f'"{digest.hexdigest()}"', int(max(times)) if times else None
+
+    def get(self, request, *args, **kwargs):
+        try:
+            fields = select_fields(request.GET.get('fields'), POST_FIELDS)
+            etag, last_modified = self.validators()
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = JsonResponse(
+                    self.get_data(fields), encoder=DjangoJSONEncoder,
+                    json_dumps_params={'ensure_ascii': False})
+        except ApiError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        except Http404:
+            return JsonResponse({'error': 'Не найдено'}, status=404)
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(
+            response, max_age=scheduler.safe_ttl(API_MAX_AGE))
+        return response
+
+
+class FeedApiView(ApiView):
+    def get_posts(self):
+        return get_posts_with_filters(apply_filters=True)
+
+    def get_data(self, fields):
+        columns = {name: POST_FIELDS[name] for name in fields}
+        queryset = self.get_posts().order_by(
+            *(f'-{name}' for name in KEY_FIELDS)
+        ).values(*{*columns.values(), *KEY_FIELDS})
+        paginator = KeysetPaginator(
+            queryset, page_size(self.request.GET.get('limit')),
+            key_fields=KEY_FIELDS)
+        page = paginator.get_page(
+            after=self.request.GET.get('after'),
+            before=self.request.GET.get('before'))
+        return {
+            'results': serialize(page, fields, columns),
+            'next': (
+                page_url(self.request, after=page.next_cursor)
+                if page.has_next() else None
+            ),
+            'previous': (
+                page_url(self.request, before=page.previous_cursor)
+                if page.has_previous() else None
+            ),
+        }
+
+
+class IndexApiView(FeedApiView):
+    def get_cache_tags(self):
+        return ['feed', 'cards']
+
+
+class CategoryApiView(FeedApiView):
+    def get_cache_tags(self):
+        self.category = get_object_or_404(
+            Category.objects.only('id'), is_published=True,
+            slug=self.kwargs['category_slug'])
+        return [f'feed:category:{self.category.id}',
+                f'category:{self.category.id}', 'cards']
+
+    def get_posts(self):
+        return get_posts_with_filters(
+            Post.objects.filter(category=self.category), apply_filters=True)
+
+
+class ProfileApiView(FeedApiView):
+    # Лента автора в API всегда публичная, как для анонимного читателя.
+
+    def get_cache_tags(self):
+        self.author = get_object_or_404(
+            User.objects.only('id'), username=self.kwargs['username'])
+        return [f'feed:author:{self.author.id}', f'user:{self.author.id}',
+                'cards']
+
+    def get_posts(self):
+        return get_posts_with_filters(
+            Post.objects.filter(author=self.author), apply_filters=True)
+
+
+class PostApiView(ApiView):
+    def get_cache_tags(self):
+        # Имена авторов, категории и места в ответе сбрасываются
+        # общим тегом карточек.
+        return [f'post:{self.kwargs["post_id"]}', 'cards']
+
+    def get_data(self, fields):
+        columns = {name: POST_FIELDS[name] for name in fields}
+        post = (
+            get_posts_with_filters(apply_filters=True)
+            .filter(id=self.kwargs['post_id'])
+            .values(*{*columns.values(), 'id'})
+            .first()
+        )
+        if post is None:
+            raise Http404
+        comments = (
+            Comment.objects.filter(post_id=post['id'])
+            .order_by('created_at', 'id')
+            .values(*COMMENT_FIELDS.values())
+        )
+        return {
+            'post': serialize([post], fields, columns)[0],
+            'comments': serialize(
+                comments, list(COMMENT_FIELDS), COMMENT_FIELDS),
+        }
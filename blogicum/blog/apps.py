@@ -5,3 +5,26 @@ class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        from django.core import checks
+        from django.core.signals import request_started
+        from django.db.backends.signals import connection_created
+
+        from . import cache, db, middleware, scheduler, signals  # noqa: F401
+
+        checks.register(cache.check_shared_cache, checks.Tags.caches)
+
+        connection_created.connect(
+            db.configure_sqlite, dispatch_uid='blog.db.configure_sqlite')
+        connection_created.connect(
+            middleware.install_query_recorder,
+            dispatch_uid='blog.middleware.install_query_recorder')
+        if db.DB_HEALTH_CHECKS:
+            request_started.connect(
+                db.check_connections, dispatch_uid='blog.db.check_connections')
+
+        if scheduler.SCHEDULER_TIMER:
+            request_started.connect(
+                scheduler.start_timer_on_first_request,
+                dispatch_uid='blog.scheduler')
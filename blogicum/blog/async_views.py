@@ -0,0 +1,37 @@
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+# В Django 3.2 нет асинхронного ORM, а синхронные представления под
+# ASGI выполняются через sync_to_async(thread_sensitive=True) в одном
+# общем потоке на весь процесс: запросы к базе разных посетителей идут
+# по очереди. Асинхронные представления ниже отдают всю синхронную
+# работу (кэш страниц, ORM, шаблон) пулу потоков одним переходом,
+# поэтому запросы выполняются параллельно.
+
+
+def _render(view, request, *args, **kwargs):
+    # Соединения с базой привязаны к потоку пула, а request_finished
+    # закрывает соединения другого потока: здесь это делается явно,
+    # как в таймере отложенных публикаций.
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            # Шаблон читает ленивые QuerySet, поэтому тоже в потоке.
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_view(view_class, **initkwargs):
+    view = view_class.as_view(**initkwargs)
+    render = sync_to_async(_render, thread_sensitive=False)
+
+    async def async_view(request, *args, **kwargs):
+        return await render(view, request, *args, **kwargs)
+
+    update_wrapper(async_view, view)
+    return async_view
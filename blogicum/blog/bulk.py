@@ -0,0 +1,215 @@
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import counters, scheduler
+from .cache import (invalidate_post_cards, invalidate_tags, post_page_tags,
+                    post_sitemap_tags, sitemap_category_tag)
+from .models import (Category, Comment, ImageJob, Location, MediaBlob, Post,
+                     post_media_names)
+from .search import get_search_backend
+
+BULK_CHUNK_SIZE = getattr(settings, 'BLOG_BULK_CHUNK_SIZE', 1000)
+
+# Массовые операции выполняются одним UPDATE или DELETE на пачку id
+# и не вызывают сигналы моделей, поэтому всё, что делают обработчики
+# из blog/signals.py (кэши, счётчики, поисковый индекс, ссылки на
+# файлы), здесь повторяется явно для каждой пачки. Функции удаления
+# принимают log(ids): он вызывается в транзакции пачки до удаления.
+
+
+def chunked_ids(queryset, chunk_size=None):
+    chunk_size = chunk_size or BULK_CHUNK_SIZE
+    queryset = queryset.order_by('id').values_list('id', flat=True)
+    last_id = 0
+    while True:
+        ids = list(queryset.filter(id__gt=last_id)[:chunk_size])
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+
+def _delete_rows(model, field, ids):
+    # Один DELETE по списку ключей без сбора объектов и сигналов,
+    # которые выполняет QuerySet.delete(); зависимые строки удаляются
+    # так же, до родительских.
+    if not ids:
+        return 0
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote(model._meta.db_table)} '
+            f'WHERE {quote(model._meta.get_field(field).column)} '
+            f'IN ({placeholders})',
+            list(ids),
+        )
+        return cursor.rowcount
+
+
+def _post_rows(post_ids):
+    return list(
+        Post.objects.filter(id__in=post_ids)
+        .values_list('id', 'category_id', 'author_id', 'pub_date')
+    )
+
+
+def invalidate_posts(rows):
+    keys = set()
+    tags = set()
+    for post_id, category_id, author_id, pub_date in rows:
+        keys.update(counters.post_feed_keys(category_id, author_id))
+        tags.update(post_page_tags(post_id, category_id, author_id))
+        tags.update(post_sitemap_tags(category_id, pub_date))
+    if rows:
+        counters.invalidate_feed_counts(*keys)
+        invalidate_tags(*tags)
+        counters.invalidate_query_counts(Post)
+        scheduler.post_schedule_changed()
+
+
+def update_posts(queryset, **values):
+    updated = 0
+    for ids in chunked_ids(queryset):
+        with transaction.atomic():
+            before = _post_rows(ids)
+            # auto_now не срабатывает в update(); updated_at нужен
+            # ключам карточек и reindex_search --incremental.
+            updated += Post.objects.filter(id__in=ids).update(
+                updated_at=timezone.now(), **values)
+            after = _post_rows(ids)
+        invalidate_posts(before + after)
+    return updated
+
+
+def delete_posts(queryset, log=None):
+    deleted = 0
+    for ids in chunked_ids(queryset):
+        with transaction.atomic():
+            if log is not None:
+                log(ids)
+            rows = _post_rows(ids)
+            media = [
+                name
+                for image, variants in Post.objects.filter(
+                    id__in=ids).values_list('image', 'image_variants')
+                for name in post_media_names(image, variants)
+            ]
+            _delete_rows(Comment, 'post', ids)
+            _delete_rows(ImageJob, 'post', ids)
+            deleted += _delete_rows(Post, 'id', ids)
+            MediaBlob.objects.release(media)
+            get_search_backend().remove_posts(ids)
+        invalidate_posts(rows)
+        counters.invalidate_query_counts(Comment)
+    return deleted
+
+
+def _recount_comments(post_ids):
+    Post.objects.filter(id__in=post_ids).update(
+        comment_count=Coalesce(Subquery(
+            Comment.objects.filter(post=OuterRef('pk'))
+            .order_by().values('post').annotate(total=Count('id'))
+            .values('total')
+        ), 0),
+        updated_at=timezone.now(),
+    )
+
+
+def update_comments(queryset, **values):
+    updated = 0
+    for ids in chunked_ids(queryset):
+        with transaction.atomic():
+            post_ids = set(
+                Comment.objects.filter(id__in=ids)
+                .values_list('post_id', flat=True)) - {None}
+            updated += Comment.objects.filter(id__in=ids).update(**values)
+            Post.objects.filter(id__in=post_ids).update(
+                updated_at=timezone.now())
+        invalidate_posts(_post_rows(post_ids))
+        counters.invalidate_query_counts(Comment)
+    return updated
+
+
+def delete_comments(queryset, log=None):
+    deleted = 0
+    for ids in chunked_ids(queryset):
+        with transaction.atomic():
+            if log is not None:
+                log(ids)
+            post_ids = set(
+                Comment.objects.filter(id__in=ids)
+                .values_list('post_id', flat=True)) - {None}
+            deleted += _delete_rows(Comment, 'id', ids)
+            _recount_comments(post_ids)
+            get_search_backend().index_posts(post_ids)
+        invalidate_posts(_post_rows(post_ids))
+        counters.invalidate_query_counts(Comment)
+    return deleted
+
+
+def invalidate_related(model, ids):
+    # Видимость категорий и местоположений входит в карточки всех
+    # публикаций, поэтому сбрасываются поколения целиком.
+    if model is Category:
+        counters.invalidate_all_feed_counts()
+        invalidate_tags('feed', 'sitemap',
+                        *(f'feed:category:{pk}' for pk in ids),
+                        *(sitemap_category_tag(pk) for pk in ids))
+    invalidate_post_cards()
+    name = model._meta.model_name
+    invalidate_tags('cards', *(f'{name}:{pk}' for pk in ids))
+    counters.invalidate_query_counts(model)
+    counters.invalidate_query_counts(Post)
+
+
+def update_related(queryset, **values):
+    model = queryset.model
+    updated = 0
+    for ids in chunked_ids(queryset):
+        updated += model.objects.filter(id__in=ids).update(**values)
+        invalidate_related(model, ids)
+    return updated
+
+
+def delete_related(queryset, log=None):
+    # on_delete=SET_NULL у публикаций повторяется одним UPDATE.
+    model = queryset.model
+    field = {Category: 'category', Location: 'location'}[model]
+    deleted = 0
+    for ids in chunked_ids(queryset):
+        update_posts(
+            Post.objects.filter(**{f'{field}_id__in': ids}), **{field: None})
+        with transaction.atomic():
+            if log is not None:
+                log(ids)
+            deleted += _delete_rows(model, 'id', ids)
+        invalidate_related(model, ids)
+    return deleted
+
+
+def delete_preview(queryset):
+    # Для подтверждения удаления считаются строки по моделям, без
+    # вывода каждого объекта, как в стандартном delete_selected.
+    model = queryset.model
+    ids = queryset.values('id')
+    preview = [(model._meta.verbose_name_plural, queryset.count())]
+    if model is Post:
+        preview += [
+            (Comment._meta.verbose_name_plural,
+             Comment.objects.filter(post_id__in=ids).count()),
+            (ImageJob._meta.verbose_name_plural,
+             ImageJob.objects.filter(post_id__in=ids).count()),
+        ]
+    elif model in (Category, Location):
+        field = model._meta.model_name
+        preview.append((
+            f'{Post._meta.verbose_name_plural} останутся без поля '
+            f'«{Post._meta.get_field(field).verbose_name}»',
+            Post.objects.filter(**{f'{field}_id__in': ids}).count(),
+        ))
+    return preview
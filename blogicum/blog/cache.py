@@ -0,0 +1,192 @@
+import hashlib
+import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+
+from . import routers
+from .scheduler import safe_ttl
+
+POST_CARD_GENERATION_KEY = 'blog:post-card:generation'
+
+PAGE_CACHE_TIMEOUT = getattr(settings, 'BLOG_PAGE_CACHE_TIMEOUT', 300)
+PAGE_CACHE_QUERY_PARAMS = ('page', 'after', 'before')
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache_is_process_local():
+    return settings.CACHES['default']['BACKEND'] in PROCESS_LOCAL_CACHES
+
+
+def check_shared_cache(app_configs, **kwargs):
+    # Сброс тегов в кэше одного процесса не виден остальным: страницы
+    # и счётчики в них устаревают до истечения PAGE_CACHE_TIMEOUT.
+    if not cache_is_process_local():
+        return []
+    return [checks.Warning(
+        'Кэш по умолчанию хранится в памяти процесса: сброс тегов '
+        'страниц не дойдёт до других процессов и команд.',
+        hint='Задайте CACHE_URL с memcached, Redis или файловым кэшем.',
+        id='blog.W001',
+    )]
+
+
+def post_card_generation():
+    return cache.get_or_set(POST_CARD_GENERATION_KEY, 1, None)
+
+
+def invalidate_post_cards():
+    try:
+        cache.incr(POST_CARD_GENERATION_KEY)
+    except ValueError:
+        cache.set(POST_CARD_GENERATION_KEY, 2, None)
+
+
+def post_card_key(post, generation, viewer=None):
+    is_author = viewer is not None and viewer.pk == post.author_id
+    return ':'.join(str(part) for part in (
+        generation,
+        post.pk,
+        post.updated_at.timestamp() if post.updated_at else '',
+        post.comment_count,
+        int(is_author),
+    ))
+
+
+def _tag_key(tag):
+    return f'blog:tag:{tag}'
+
+
+def new_tag_version():
+    # Версия начинается со времени изменения: по ней API отдаёт
+    # Last-Modified, не обращаясь к базе.
+    return f'{time.time_ns():x}:{uuid4().hex}'
+
+
+def tag_version_time(version):
+    stamp, _, unique = version.partition(':')
+    if not unique:
+        return None
+    return int(stamp, 16) / 1e9
+
+
+def get_tag_versions(tags):
+    keys = {_tag_key(tag): tag for tag in tags}
+    versions = cache.get_many(keys)
+    missing = {key: new_tag_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def invalidate_tags(*tags):
+    cache.set_many({_tag_key(tag): new_tag_version() for tag in tags}, None)
+
+
+def changed_within_lag(versions):
+    # Изменения по тегам, сброшенным позже REPLICA_LAG секунд назад,
+    # реплика может ещё не содержать: ответ, который сохранится под
+    # этими версиями, нельзя собирать из реплики.
+    threshold = time.time() - routers.REPLICA_LAG
+    return any(
+        (tag_version_time(version) or 0) > threshold
+        for version in versions.values()
+    )
+
+
+def post_page_tags(post_id, category_id, author_id):
+    return [
+        f'post:{post_id}',
+        'feed',
+        f'feed:category:{category_id}',
+        f'feed:author:{author_id}',
+    ]
+
+
+def sitemap_shard_tag(category_id, pub_date):
+    month = timezone.localtime(pub_date).strftime('%Y-%m')
+    return f'sitemap:{category_id}:{month}'
+
+
+def sitemap_category_tag(category_id):
+    return f'sitemap:category:{category_id}'
+
+
+def post_sitemap_tags(category_id, pub_date):
+    if category_id is None or pub_date is None:
+        return ['sitemap']
+    return ['sitemap', sitemap_shard_tag(category_id, pub_date)]
+
+
+def page_cache_key(request):
+    params = '&'.join(
+        f'{name}={request.GET[name]}'
+        for name in PAGE_CACHE_QUERY_PARAMS if name in request.GET
+    )
+    digest = hashlib.md5(
+        f'{request.path}?{params}'.encode()).hexdigest()
+    return f'blog:page:{digest}'
+
+
+def get_cached_page(key):
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    tags, status, content, headers = entry
+    if get_tag_versions(tags) != tags:
+        return None
+    response = HttpResponse(content, status=status)
+    for header, value in headers:
+        response[header] = value
+    return response
+
+
+def store_page(key, response, tags):
+    timeout = safe_ttl(PAGE_CACHE_TIMEOUT)
+    if timeout <= 0:
+        return
+    versions = get_tag_versions(tags)
+    if routers.reads_from_replica() and changed_within_lag(versions):
+        return
+    cache.set(key, (
+        versions,
+        response.status_code,
+        response.content,
+        list(response.items()),
+    ), timeout)
+
+
+class AnonymousPageCacheMixin:
+    def get_cache_tags(self):
+        return []
+
+    def dispatch(self, request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = page_cache_key(request)
+        cached = get_cached_page(key)
+        if cached is not None:
+            return cached
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+
+        def store(response):
+            store_page(key, response, self.get_cache_tags())
+
+        if getattr(response, 'is_rendered', True):
+            store(response)
+        else:
+            response.add_post_render_callback(store)
+        return response
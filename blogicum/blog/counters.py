@@ -0,0 +1,138 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+
+from . import routers
+from .cache import changed_within_lag, get_tag_versions
+from .scheduler import safe_ttl
+
+FEED_COUNT_TIMEOUT = getattr(settings, 'BLOG_FEED_COUNT_TIMEOUT', 300)
+FEED_COUNT_ESTIMATE = getattr(settings, 'BLOG_FEED_COUNT_ESTIMATE', False)
+FEED_COUNT_ESTIMATE_MIN = getattr(
+    settings, 'BLOG_FEED_COUNT_ESTIMATE_MIN', 10_000)
+
+GENERATION_KEY = 'blog:feed-count:generation'
+
+
+def published_feed_key():
+    return 'published'
+
+
+def category_feed_key(category_id):
+    return f'category:{category_id}'
+
+
+def author_feed_key(author_id, own=False):
+    return f'author-own:{author_id}' if own else f'author:{author_id}'
+
+
+def _model_version_key(model):
+    return f'blog:feed-count:model:{model._meta.label_lower}'
+
+
+def query_count_key(queryset):
+    # Ключ для произвольной выборки (списки админки) включает версию
+    # модели: любое сохранение или удаление её записей сбрасывает все
+    # такие счётчики разом.
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        sql, params = '', ()
+    digest = hashlib.md5(f'{sql}{params!r}'.encode()).hexdigest()
+    version = cache.get_or_set(_model_version_key(queryset.model), 1, None)
+    return f'query:{version}:{digest}'
+
+
+def invalidate_query_counts(model):
+    try:
+        cache.incr(_model_version_key(model))
+    except ValueError:
+        cache.set(_model_version_key(model), 2, None)
+
+
+def feed_count_tag(feed_key):
+    # Тег кэша страниц, который сбрасывается вместе со счётчиком.
+    kind, _, pk = feed_key.partition(':')
+    return {
+        'published': 'feed',
+        'category': f'feed:category:{pk}',
+        'author': f'feed:author:{pk}',
+        'author-own': f'feed:author:{pk}',
+    }.get(kind)
+
+
+def _generation():
+    return cache.get_or_set(GENERATION_KEY, 1, None)
+
+
+def _cache_key(feed_key, generation=None):
+    generation = generation or _generation()
+    return f'blog:feed-count:{generation}:{feed_key}'
+
+
+def estimate_count(queryset):
+    # Оценка планировщика есть только у PostgreSQL; для остальных
+    # баз возвращается None, и считается точное значение.
+    # QuerySet.explain() в Django 3.2 склеивает строку результата через
+    # str(), и JSON, уже разобранный psycopg2, в ответе не читается:
+    # EXPLAIN выполняется напрямую.
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def get_feed_count(feed_key, queryset):
+    key = _cache_key(feed_key)
+    count = cache.get(key)
+    if count is not None:
+        return count
+
+    count = None
+    if FEED_COUNT_ESTIMATE:
+        count = estimate_count(queryset)
+        if count is not None and count < FEED_COUNT_ESTIMATE_MIN:
+            count = None
+    if count is None:
+        count = queryset.order_by().count()
+    tag = feed_count_tag(feed_key)
+    if (tag is not None and routers.reads_from_replica()
+            and changed_within_lag(get_tag_versions([tag]))):
+        # Число из отстающей реплики не кэшируется.
+        return count
+    cache.set(key, count, safe_ttl(FEED_COUNT_TIMEOUT))
+    return count
+
+
+def invalidate_feed_counts(*feed_keys):
+    generation = _generation()
+    cache.delete_many([_cache_key(key, generation) for key in feed_keys])
+
+
+def invalidate_all_feed_counts():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 2, None)
+
+
+def post_feed_keys(category_id, author_id):
+    return [
+        published_feed_key(),
+        category_feed_key(category_id),
+        author_feed_key(author_id),
+        author_feed_key(author_id, own=True),
+    ]
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.db import connections
+
+# Параметры соединения: действуют, пока оно открыто, и не меняют файл
+# базы. Отрицательный cache_size — размер в КиБ.
+SQLITE_PRAGMAS = getattr(settings, 'BLOG_SQLITE_PRAGMAS', {
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+})
+# Режим журнала записывается в сам файл базы, поэтому включается явно
+# для рабочей базы (BLOG_SQLITE_JOURNAL_MODE = 'WAL'), а не любой
+# командой manage.py над файлом из репозитория. В WAL чтение лент не
+# ждёт записи комментариев, а synchronous=NORMAL безопасен при сбое
+# процесса и не делает fsync на каждую транзакцию.
+SQLITE_JOURNAL_MODE = getattr(settings, 'BLOG_SQLITE_JOURNAL_MODE', None)
+DB_HEALTH_CHECKS = getattr(settings, 'BLOG_DB_HEALTH_CHECKS', True)
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    # Напрямую через sqlite3, мимо execute_wrapper: настройки соединения
+    # не попадают в статистику запросов страницы.
+    pragmas = dict(SQLITE_PRAGMAS)
+    if SQLITE_JOURNAL_MODE:
+        pragmas['journal_mode'] = SQLITE_JOURNAL_MODE
+    for name, value in pragmas.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+def check_connections(**kwargs):
+    # CONN_HEALTH_CHECKS появились только в Django 4.1: постоянное
+    # соединение, оборванное сервером или PgBouncer, проверяется здесь
+    # в начале запроса и закрывается, чтобы ORM открыл новое.
+    for connection in connections.all():
+        if (connection.connection is None
+                or not connection.settings_dict['CONN_MAX_AGE']
+                or connection.in_atomic_block):
+            continue
+        if not connection.is_usable():
+            connection.close()
@@ -0,0 +1,222 @@
+import hashlib
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.conf import settings
+from django.db.models import Max
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import (Atom1Feed, Rss201rev2Feed,
+                                        SyndicationFeed)
+from django.utils.http import http_date
+from django.utils.xmlutils import SimplerXMLGenerator
+from django.views import View
+
+from .cache import changed_within_lag, get_tag_versions, tag_version_time
+from .counters import (author_feed_key, category_feed_key, get_feed_count,
+                       published_feed_key)
+from .models import Category, Post, User
+from .routers import use_primary
+from .views import get_posts_with_filters
+
+FEED_ITEMS = getattr(settings, 'BLOG_FEED_ITEMS', 100)
+FEED_CHUNK_SIZE = 16 * 1024
+
+
+class StreamingFeedMixin:
+    # Каркас ленты (заголовок канала и закрывающие теги) строит сам
+    # feedgenerator, а записи пишутся по одной из итератора и отдаются
+    # кусками по FEED_CHUNK_SIZE: лента целиком в памяти не собирается.
+    closing_tags = None
+    updated = None
+
+    def latest_post_date(self):
+        return self.updated or super().latest_post_date()
+
+    def stream(self, items, encoding='utf-8'):
+        self.items = []
+        skeleton = self.writeString(encoding)
+        head, _, tail = skeleton.rpartition(self.closing_tags)
+        yield head
+
+        buffer = StringIO()
+        handler = SimplerXMLGenerator(buffer, encoding)
+        for item in items:
+            self.items = [item]
+            self.write_items(handler)
+            if buffer.tell() >= FEED_CHUNK_SIZE:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        self.items = []
+        yield buffer.getvalue() + self.closing_tags + tail
+
+
+class StreamingRssFeed(StreamingFeedMixin, Rss201rev2Feed):
+    closing_tags = '</channel></rss>'
+
+
+class StreamingAtomFeed(StreamingFeedMixin, Atom1Feed):
+    closing_tags = '</feed>'
+
+
+FEED_FORMATS = {
+    'rss': StreamingRssFeed,
+    'atom': StreamingAtomFeed,
+}
+
+
+class PostFeedView(View):
+    http_method_names = ['get', 'head', 'options']
+    read_from_replica = True
+    title = 'Блогикум'
+    description = 'Новые публикации'
+
+    def get_object(self):
+        return None
+
+    def get_posts(self):
+        return get_posts_with_filters(apply_filters=True)
+
+    def get_count_key(self):
+        return published_feed_key()
+
+    def get_link(self):
+        return reverse('blog:index')
+
+    def get_cache_tags(self):
+        # Имена авторов и категорий в записях меняются без правки
+        # публикаций: их сбрасывают теги карточек (blog/signals.py).
+        return ['feed', 'cards']
+
+    def validators(self, posts):
+        # Новейшая pub_date отражает новые и отложенные публикации,
+        # новейшая updated_at — правки; число записей из кэша счётчиков
+        # меняет ETag при удалении или скрытии публикации, версии тегов —
+        # при переименовании категории или автора.
+        versions = get_tag_versions(self.get_cache_tags())
+        if changed_within_lag(versions):
+            use_primary()
+        latest = posts.aggregate(
+            published=Max('pub_date'), updated=Max('updated_at'))
+        count = get_feed_count(self.get_count_key(), posts)
+        stamps = [
+            int(value.timestamp())
+            for value in latest.values() if value is not None
+        ] + [
+            int(stamp) for stamp in map(tag_version_time, versions.values())
+            if stamp is not None
+        ]
+        digest = hashlib.md5(
+            f'{self.request.path}:{count}:'
+            f'{latest["published"]}:{latest["updated"]}'.encode())
+        for tag in sorted(versions):
+            digest.update(f';{tag}={versions[tag]}'.encode())
+        return f'"{digest.hexdigest()}"', max(stamps) if stamps else None
+
+    def get_rows(self, posts):
+        # Записи выбираются до возврата ответа: при отдаче потока
+        # промежуточные слои (статистика запросов, выбор реплики) уже
+        # отработали, а под ASGI итерация идёт в цикле событий, где
+        # запросы к базе запрещены. Лента ограничена FEED_ITEMS, по
+        # частям пишется только XML.
+        return list(
+            posts.order_by('-pub_date', '-id')
+            .values('id', 'title', 'text', 'pub_date', 'updated_at',
+                    'author__username', 'category__title')
+            [:FEED_ITEMS]
+        )
+
+    def items(self, rows):
+        # add_item приводит значения к виду, который ждёт генератор.
+        normalizer = SyndicationFeed('', '', '')
+        for row in rows:
+            link = self.request.build_absolute_uri(
+                reverse('blog:post_detail', args=[row['id']]))
+            category = row['category__title']
+            normalizer.add_item(
+                title=row['title'],
+                link=link,
+                description=row['text'],
+                author_name=row['author__username'],
+                pubdate=row['pub_date'],
+                updateddate=row['updated_at'],
+                unique_id=link,
+                categories=[category] if category else (),
+            )
+            yield normalizer.items.pop()
+
+    def get(self, request, *args, **kwargs):
+        feed_class = FEED_FORMATS.get(kwargs['kind'])
+        if feed_class is None:
+            raise Http404
+        self.object = self.get_object()
+        posts = self.get_posts()
+        etag, timestamp = self.validators(posts)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp)
+        if response is None:
+            feed = feed_class(
+                title=self.title,
+                link=request.build_absolute_uri(self.get_link()),
+                description=self.description,
+                feed_url=request.build_absolute_uri(),
+                language=settings.LANGUAGE_CODE,
+            )
+            if timestamp is not None:
+                feed.updated = datetime.fromtimestamp(
+                    timestamp, timezone.utc)
+            response = StreamingHttpResponse(
+                feed.stream(self.items(self.get_rows(posts))),
+                content_type=feed.content_type)
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        return response
+
+
+class CategoryFeedView(PostFeedView):
+    def get_object(self):
+        category = get_object_or_404(
+            Category, is_published=True, slug=self.kwargs['category_slug'])
+        self.title = f'Блогикум: {category.title}'
+        self.description = category.description
+        return category
+
+    def get_posts(self):
+        return get_posts_with_filters(
+            Post.objects.filter(category=self.object), apply_filters=True)
+
+    def get_count_key(self):
+        return category_feed_key(self.object.id)
+
+    def get_cache_tags(self):
+        return [f'feed:category:{self.object.id}',
+                f'category:{self.object.id}', 'cards']
+
+    def get_link(self):
+        return reverse('blog:category_posts', args=[self.object.slug])
+
+
+class ProfileFeedView(PostFeedView):
+    def get_object(self):
+        author = get_object_or_404(User, username=self.kwargs['username'])
+        self.title = f'Блогикум: @{author.username}'
+        self.description = f'Публикации @{author.username}'
+        return author
+
+    def get_posts(self):
+        return get_posts_with_filters(
+            Post.objects.filter(author=self.object), apply_filters=True)
+
+    def get_count_key(self):
+        return author_feed_key(self.object.id)
+
+    def get_cache_tags(self):
+        return [f'feed:author:{self.object.id}', f'user:{self.object.id}',
+                'cards']
+
+    def get_link(self):
+        return reverse('blog:profile', args=[self.object.username])
@@ -0,0 +1,92 @@
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .models import Post
+
+IMAGE_VARIANT_WIDTHS = getattr(
+    settings, 'BLOG_IMAGE_VARIANT_WIDTHS', (320, 640, 960, 1280))
+IMAGE_DEFAULT_WIDTH = getattr(settings, 'BLOG_IMAGE_DEFAULT_WIDTH', 640)
+IMAGE_VARIANT_FORMAT = getattr(settings, 'BLOG_IMAGE_VARIANT_FORMAT', 'JPEG')
+IMAGE_VARIANT_QUALITY = getattr(settings, 'BLOG_IMAGE_VARIANT_QUALITY', 82)
+IMAGE_ORIGINAL_QUALITY = getattr(settings, 'BLOG_IMAGE_ORIGINAL_QUALITY', 95)
+
+EXTENSIONS = {'JPEG': 'jpg', 'WEBP': 'webp', 'PNG': 'png'}
+
+
+def _encode(image, image_format, quality):
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    # exif не передаётся, поэтому метаданные (в том числе GPS)
+    # в сохранённые файлы не попадают.
+    image.save(
+        buffer,
+        format=image_format,
+        quality=quality,
+        optimize=True,
+        progressive=image_format == 'JPEG',
+    )
+    return buffer.getvalue()
+
+
+def _save(storage, directory, image_format, content):
+    # Имя файла выбирает хранилище по хешу содержимого; от переданного
+    # имени используются только каталог и расширение.
+    extension = EXTENSIONS[image_format]
+    return storage.save(
+        os.path.join(directory, f'image.{extension}'), ContentFile(content))
+
+
+def image_storage():
+    return Post._meta.get_field('image').storage
+
+
+def process_image(name, storage=None):
+    # Копии сохраняются рядом с оригиналом под именем с хешем
+    # содержимого, поэтому их можно кэшировать бессрочно.
+    storage = storage or image_storage()
+    directory = Post._meta.get_field('image').upload_to
+
+    with storage.open(name, 'rb') as source:
+        image = Image.open(source)
+        image_format = image.format
+        has_metadata = bool(image.getexif()) or 'icc_profile' in image.info
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    original = name
+    if has_metadata or image_format not in EXTENSIONS:
+        original_format = (
+            image_format if image_format in EXTENSIONS else 'JPEG')
+        original = _save(
+            storage, directory, original_format,
+            _encode(image, original_format, IMAGE_ORIGINAL_QUALITY),
+        )
+
+    width, height = image.size
+    variants = []
+    for target in sorted(set(IMAGE_VARIANT_WIDTHS)):
+        if target >= width:
+            break
+        size = (target, max(round(height * target / width), 1))
+        content = _encode(
+            image.resize(size, Image.Resampling.LANCZOS),
+            IMAGE_VARIANT_FORMAT, IMAGE_VARIANT_QUALITY,
+        )
+        variants.append({
+            'name': _save(
+                storage, directory, IMAGE_VARIANT_FORMAT, content),
+            'width': size[0],
+            'height': size[1],
+        })
+
+    return {
+        'original': original,
+        'width': width,
+        'height': height,
+        'variants': variants,
+    }
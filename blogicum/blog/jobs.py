@@ -0,0 +1,90 @@
+from datetime import timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .images import process_image
+from .models import ImageJob, Post
+
+IMAGE_JOBS_INLINE = getattr(settings, 'BLOG_IMAGE_JOBS_INLINE', False)
+IMAGE_JOB_MAX_ATTEMPTS = getattr(settings, 'BLOG_IMAGE_JOB_MAX_ATTEMPTS', 3)
+
+
+def enqueue_image_job(post):
+    # Вызывается из post_save при замене фото, когда в image_variants уже
+    # записан признак обработки. Старые файлы здесь не удаляются:
+    # одинаковые фото хранятся в одном файле, и неиспользуемые файлы
+    # по счётчикам ссылок убирает команда collect_media.
+    job = ImageJob.objects.create(post=post, image_name=post.image.name)
+    if IMAGE_JOBS_INLINE:
+        run_job(job)
+    return job
+
+
+def claim_jobs(limit):
+    token = uuid4().hex
+    ids = list(
+        ImageJob.objects.filter(status=ImageJob.PENDING)
+        .values_list('id', flat=True)[:limit]
+    )
+    # Условие на статус в UPDATE не даёт двум обработчикам
+    # забрать одно и то же задание.
+    ImageJob.objects.filter(id__in=ids, status=ImageJob.PENDING).update(
+        status=ImageJob.RUNNING,
+        claimed_by=token,
+        attempts=F('attempts') + 1,
+        updated_at=timezone.now(),
+    )
+    return list(ImageJob.objects.filter(
+        claimed_by=token, status=ImageJob.RUNNING))
+
+
+def requeue_stale_jobs(older_than):
+    return ImageJob.objects.filter(
+        status=ImageJob.RUNNING,
+        updated_at__lt=timezone.now() - timedelta(seconds=older_than),
+    ).update(status=ImageJob.PENDING, claimed_by='')
+
+
+def complete_job(job, result):
+    post = Post.objects.filter(pk=job.post_id, image=job.image_name).first()
+    # Если фото успели заменить или публикацию удалили, результат
+    # не сохраняется.
+    if post is not None:
+        post.image.name = result['original']
+        post.image_variants = {
+            'width': result['width'],
+            'height': result['height'],
+            'variants': result['variants'],
+        }
+        post.save(update_fields=['image', 'image_variants', 'updated_at'])
+
+    job.status = ImageJob.DONE
+    job.error = ''
+    job.save(update_fields=['status', 'error', 'updated_at'])
+
+
+def fail_job(job, error):
+    job.error = error
+    if job.attempts < IMAGE_JOB_MAX_ATTEMPTS:
+        job.status = ImageJob.PENDING
+    else:
+        job.status = ImageJob.FAILED
+        post = Post.objects.filter(
+            pk=job.post_id, image=job.image_name).first()
+        if post is not None:
+            # Без копий карточка покажет исходный файл вместо заглушки.
+            post.image_variants = {}
+            post.save(update_fields=['image_variants', 'updated_at'])
+    job.save(update_fields=['status', 'error', 'updated_at'])
+
+
+def run_job(job):
+    try:
+        result = process_image(job.image_name)
+    except Exception as error:
+        fail_job(job, repr(error))
+    else:
+        complete_job(job, result)
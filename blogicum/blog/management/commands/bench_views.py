@@ -0,0 +1,119 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.test import AsyncClient, Client
+
+from blog.urls import ASYNC_VIEWS
+
+
+def _summary(latencies, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50': statistics.median(latencies) * 1000,
+        'p95': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def _client(client_class, user):
+    client = client_class()
+    if user is not None:
+        client.force_login(user)
+    return client
+
+
+def run_wsgi(path, requests, concurrency, user=None):
+    # Как gunicorn с --threads: синхронный обработчик в пуле потоков.
+    def worker(count):
+        client = _client(Client, user)
+        latencies = []
+        for _ in range(count):
+            start = time.perf_counter()
+            client.get(path)
+            latencies.append(time.perf_counter() - start)
+        close_old_connections()
+        return latencies
+
+    counts = [
+        requests // concurrency + (i < requests % concurrency)
+        for i in range(concurrency)
+    ]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(worker, counts))
+    elapsed = time.perf_counter() - start
+    return _summary([x for result in results for x in result], elapsed)
+
+
+def run_asgi(path, requests, concurrency, user=None):
+    # Как uvicorn: один цикл событий, concurrency запросов одновременно.
+    client = _client(AsyncClient, user)
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                await client.get(path)
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return _summary(latencies, time.perf_counter() - start)
+
+    return asyncio.run(main())
+
+
+MODES = {'wsgi': run_wsgi, 'asgi': run_asgi}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность адресов блога через WSGI '
+        '(пул потоков) и ASGI (конкурентные запросы в цикле событий). '
+        'Асинхронные версии представлений включаются настройкой '
+        'BLOG_ASYNC_VIEWS; запускать на базе с реальными данными.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument(
+            '--mode', choices=[*MODES, 'both'], default='both')
+        parser.add_argument(
+            '--user',
+            help='Запросы от имени пользователя: кэш страниц для '
+                 'анонимов не используется.')
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = get_user_model().objects.get(
+                    username=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(
+                    f'Пользователь {options["user"]} не найден')
+        modes = list(MODES) if options['mode'] == 'both' else [
+            options['mode']]
+        self.stdout.write(
+            'Асинхронные адреса: '
+            f'{", ".join(sorted(ASYNC_VIEWS)) or "нет"}')
+        for path in options['paths']:
+            for mode in modes:
+                # Первый запрос прогревает кэши и соединения.
+                MODES[mode](path, 1, 1, user)
+                result = MODES[mode](
+                    path, options['requests'], options['concurrency'], user)
+                self.stdout.write(
+                    f'{mode:<5} {path:<40} {result["rps"]:8.1f} req/s  '
+                    f'p50 {result["p50"]:7.1f} ms  '
+                    f'p95 {result["p95"]:7.1f} ms')
@@ -0,0 +1,74 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.images import image_storage
+from blog.models import MediaBlob, Post
+
+
+def walk_files(root):
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет из хранилища фото файлы, на которые не ссылается ни одна '
+        'публикация. Каталог обходится потоково, ссылки проверяются '
+        'пачками.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--grace', type=int, default=24 * 60 * 60,
+            help='Не трогать файлы моложе стольких секунд: их могли '
+                 'загрузить, но ещё не привязать к публикации.')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, batch_size, grace, dry_run, **options):
+        storage = image_storage()
+        root = storage.path(Post._meta.get_field('image').upload_to)
+        if not os.path.isdir(root):
+            return
+        deadline = time.time() - grace
+
+        removed = 0
+        batch = []
+        for entry in walk_files(root):
+            if entry.stat().st_mtime > deadline:
+                continue
+            name = os.path.relpath(entry.path, storage.location)
+            batch.append(name.replace(os.sep, '/'))
+            if len(batch) >= batch_size:
+                removed += self.collect(storage, batch, dry_run)
+                batch = []
+        if batch:
+            removed += self.collect(storage, batch, dry_run)
+
+        verb = 'Будет удалено' if dry_run else 'Удалено'
+        self.stdout.write(f'{verb} файлов: {removed}')
+
+    def collect(self, storage, names, dry_run):
+        referenced = set(
+            MediaBlob.objects.filter(name__in=names, refcount__gt=0)
+            .values_list('name', flat=True)
+        )
+        # Файлы до перехода на счётчики могут не иметь записи MediaBlob.
+        referenced.update(
+            Post.objects.filter(image__in=names)
+            .values_list('image', flat=True)
+        )
+        orphans = [name for name in names if name not in referenced]
+        if orphans and not dry_run:
+            for name in orphans:
+                storage.delete(name)
+            MediaBlob.objects.filter(name__in=orphans, refcount=0).delete()
+        return len(orphans)
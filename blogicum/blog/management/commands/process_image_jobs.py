@@ -0,0 +1,67 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from blog.images import process_image
+from blog.jobs import claim_jobs, complete_job, fail_job, requeue_stale_jobs
+
+
+def _init_worker():
+    django.setup()
+
+
+class Command(BaseCommand):
+    help = (
+        'Обрабатывает очередь фото публикаций в пуле процессов: '
+        'поворот по EXIF, удаление метаданных, уменьшенные копии.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument('--batch-size', type=int, default=20)
+        parser.add_argument(
+            '--poll-interval', type=float, default=5.0,
+            help='Пауза в секундах, когда очередь пуста.')
+        parser.add_argument(
+            '--requeue-after', type=int, default=600,
+            help='Через сколько секунд вернуть в очередь зависшее задание.')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать очередь и завершиться.')
+
+    def handle(self, *args, workers, batch_size, poll_interval,
+               requeue_after, once, **options):
+        # Дочерние процессы работают только с файлами, а соединения
+        # с базой не должны наследоваться при fork.
+        connections.close_all()
+        processed = 0
+        with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker) as pool:
+            while True:
+                requeue_stale_jobs(requeue_after)
+                jobs = claim_jobs(batch_size)
+                if not jobs:
+                    if once:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                futures = {
+                    pool.submit(process_image, job.image_name): job
+                    for job in jobs
+                }
+                for future in as_completed(futures):
+                    job = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as error:
+                        fail_job(job, repr(error))
+                    else:
+                        complete_job(job, result)
+                        processed += 1
+
+        self.stdout.write(f'Обработано фото: {processed}')
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.cache import cache_is_process_local
+from blog.scheduler import release_due_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Рассылает сигнал post_became_visible для публикаций, чья '
+        'pub_date наступила с прошлого запуска. Запускается из cron; '
+        'кэш должен быть общим с веб-процессами.'
+    )
+
+    def handle(self, *args, **options):
+        # Теги, сброшенные в памяти этого процесса, веб-процессы
+        # не увидят, а отметка о последнем запуске пропадёт.
+        if cache_is_process_local():
+            raise CommandError(
+                'Кэш по умолчанию хранится в памяти процесса: сброс '
+                'страниц не дойдёт до сайта. Задайте общий кэш (CACHE_URL).'
+            )
+        posts = release_due_posts()
+        self.stdout.write(f'Опубликовано по расписанию: {len(posts)}')
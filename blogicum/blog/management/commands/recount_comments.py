@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает Post.comment_count и исправляет расхождения.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать количество расхождений.')
+
+    def handle(self, *args, batch_size, dry_run, **options):
+        actual = Coalesce(Subquery(
+            Comment.objects.filter(post=OuterRef('pk'))
+            .order_by().values('post').annotate(total=Count('id'))
+            .values('total')
+        ), 0)
+
+        last_id = 0
+        drifted_total = 0
+        while True:
+            ids = list(
+                Post.objects.filter(id__gt=last_id).order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            batch = Post.objects.filter(id__gt=last_id, id__lte=ids[-1])
+            last_id = ids[-1]
+
+            drifted = list(
+                batch.annotate(actual=actual)
+                .exclude(comment_count=F('actual'))
+                .values_list('id', flat=True)
+            )
+            if drifted and not dry_run:
+                Post.objects.filter(id__in=drifted).update(
+                    comment_count=actual)
+            drifted_total += len(drifted)
+
+        verb = 'Найдено' if dry_run else 'Исправлено'
+        self.stdout.write(f'{verb} расхождений: {drifted_total}')
@@ -0,0 +1,187 @@
+import mimetypes
+import os
+import posixpath
+import re
+import stat
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+# None — файл отдаёт Django; 'x-sendfile' — Apache/lighttpd по
+# абсолютному пути; 'x-accel-redirect' — nginx через internal-location
+# с префиксом MEDIA_ACCEL_PREFIX.
+MEDIA_SENDFILE = getattr(settings, 'BLOG_MEDIA_SENDFILE', None)
+MEDIA_ACCEL_PREFIX = getattr(
+    settings, 'BLOG_MEDIA_ACCEL_PREFIX', '/protected-media/')
+MEDIA_MAX_AGE = getattr(settings, 'BLOG_MEDIA_MAX_AGE', 3600)
+MEDIA_IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+HASHED_NAME_RE = re.compile(r'^[0-9a-f]{64}$')
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class MediaResponse(FileResponse):
+    block_size = 64 * 1024
+
+
+class FileRange:
+    # Отдаёт length байт файла, начиная со start. fileno() и tell()
+    # позволяют wsgi.file_wrapper сервера (например, gunicorn) отправить
+    # диапазон через os.sendfile без копирования в Python.
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def is_hashed_name(path):
+    stem = os.path.splitext(posixpath.basename(path))[0]
+    return bool(HASHED_NAME_RE.match(stem))
+
+
+def file_etag(path, file_stat):
+    if is_hashed_name(path):
+        # Имя уже содержит sha256 содержимого.
+        return '"%s"' % os.path.splitext(posixpath.basename(path))[0]
+    return '"%x-%x"' % (file_stat.st_mtime_ns, file_stat.st_size)
+
+
+def parse_range(header, size):
+    # Поддерживается один диапазон; несколько диапазонов и ошибки
+    # синтаксиса игнорируются, и файл отдаётся целиком.
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start:
+        if not end:
+            return None
+        length = int(end)
+        if not length or not size:
+            raise RangeNotSatisfiable
+        return max(size - length, 0), size - 1
+    start = int(start)
+    if end and int(end) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    end = int(end) if end else size - 1
+    return start, min(end, size - 1)
+
+
+def range_applies(request, etag, last_modified):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(last_modified)
+
+
+def _set_cache_headers(response, path, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if is_hashed_name(path):
+        response['Cache-Control'] = (
+            f'public, max-age={MEDIA_IMMUTABLE_MAX_AGE}, immutable')
+    else:
+        response['Cache-Control'] = f'public, max-age={MEDIA_MAX_AGE}'
+
+
+def _offload(path, full_path, content_type):
+    response = HttpResponse(content_type=content_type)
+    if MEDIA_SENDFILE == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = MEDIA_ACCEL_PREFIX + path
+    else:
+        response['X-Sendfile'] = full_path
+    return response
+
+
+def resolve_media(path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        file_stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404
+    return full_path, file_stat
+
+
+@require_safe
+def serve_media(request, path):
+    path = posixpath.normpath(path).lstrip('/')
+    full_path, file_stat = resolve_media(path)
+    etag = file_etag(path, file_stat)
+    last_modified = file_stat.st_mtime
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified))
+    if not_modified is not None:
+        _set_cache_headers(not_modified, path, etag, last_modified)
+        return not_modified
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+    if MEDIA_SENDFILE:
+        # Диапазоны и sendfile выполняет фронтенд-сервер.
+        response = _offload(path, full_path, content_type)
+        _set_cache_headers(response, path, etag, last_modified)
+        return response
+
+    size = file_stat.st_size
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    if range_header and range_applies(request, etag, last_modified):
+        try:
+            byte_range = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            response['Accept-Ranges'] = 'bytes'
+            return response
+
+    file = open(full_path, 'rb')
+    if byte_range is None:
+        response = MediaResponse(file, content_type=content_type)
+        response['Content-Length'] = size
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = MediaResponse(
+            FileRange(file, start, length), content_type=content_type,
+            status=206)
+        response['Content-Length'] = length
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Accept-Ranges'] = 'bytes'
+    _set_cache_headers(response, path, etag, last_modified)
+    return response
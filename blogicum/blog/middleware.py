@@ -0,0 +1,162 @@
+import asyncio
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from .routers import REPLICA_LAG, current_request, replica_aliases
+
+REPLICA_PIN_COOKIE = getattr(
+    settings, 'BLOG_REPLICA_PIN_COOKIE', 'blog_primary')
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+current_stats = ContextVar('blog_query_stats', default=None)
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            # Отпечаток — SQL с плейсхолдерами: одинаковый отпечаток
+            # с разными параметрами выдаёт N+1.
+            self.fingerprints[sql] += 1
+            self.statements[(sql, repr(params))] += 1
+
+    @property
+    def duplicates(self):
+        return {
+            statement: count
+            for statement, count in self.statements.items() if count > 1
+        }
+
+    @property
+    def repeated_fingerprints(self):
+        return {
+            sql: count
+            for sql, count in self.fingerprints.items() if count > 1
+        }
+
+    def server_timing(self):
+        return (
+            f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries", '
+            f'dup;desc="{len(self.duplicates)} duplicated"'
+        )
+
+
+def record_query(execute, sql, params, many, context):
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats(execute, sql, params, many, context)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    # Соединения принадлежат потокам, а асинхронные представления
+    # выполняют запросы в пуле потоков: обёртка ставится на каждое
+    # соединение при открытии и находит статистику запроса через
+    # контекстную переменную, которую sync_to_async передаёт в поток.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class HybridMiddleware:
+    # Работает и в синхронной, и в асинхронной цепочке. Промежуточный
+    # слой только для синхронного режима заставил бы Django под ASGI
+    # выполнять всю цепочку в одном общем потоке, и асинхронные
+    # представления (blog/async_views.py) шли бы по очереди.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with self.around(request):
+            response = self.get_response(request)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        with self.around(request):
+            response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def around(self, request):
+        return nullcontext()
+
+    def process_response(self, request, response):
+        return response
+
+
+@contextmanager
+def context_value(variable, value):
+    token = variable.set(value)
+    try:
+        yield value
+    finally:
+        variable.reset(token)
+
+
+class QueryCountMiddleware(HybridMiddleware):
+    def around(self, request):
+        request.query_stats = QueryStats()
+        return context_value(current_stats, request.query_stats)
+
+    def process_response(self, request, response):
+        if settings.DEBUG:
+            response['Server-Timing'] = request.query_stats.server_timing()
+        return response
+
+
+class ReplicaMiddleware(HybridMiddleware):
+    # После успешного изменяющего запроса посетитель получает cookie,
+    # и REPLICA_LAG секунд его чтения идут в основную базу: автор сразу
+    # видит свою публикацию или комментарий, даже если реплика ещё
+    # отстаёт. Остальные читают реплику; чтобы её отставание не попало
+    # в кэш под новыми версиями тегов, ответы по недавно сброшенным
+    # тегам не кэшируются или читаются из основной базы
+    # (changed_within_lag в blog/cache.py).
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if self.is_async:
+            # Синхронный process_view Django вызывал бы в общем потоке.
+            self.process_view = self.aprocess_view
+
+    def around(self, request):
+        request.read_from_replica = False
+        return context_value(current_request, request)
+
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(
+                REPLICA_PIN_COOKIE, '1', max_age=REPLICA_LAG,
+                httponly=True, samesite='Lax')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = getattr(view_func, 'view_class', view_func)
+        request.read_from_replica = bool(
+            getattr(view, 'read_from_replica', False)
+            and replica_aliases()
+            and request.method in SAFE_METHODS
+            and REPLICA_PIN_COOKIE not in request.COOKIES)
+
+    async def aprocess_view(self, *args):
+        return ReplicaMiddleware.process_view(self, *args)
@@ -0,0 +1,51 @@
+# Generated by Django 3.2.16 on 2026-10-17 06:15
+
+import blog.storage
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def count_media_references(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    MediaBlob = apps.get_model('blog', 'MediaBlob')
+    references = Counter()
+    for image, variants in Post.objects.exclude(image='').values_list(
+            'image', 'image_variants').iterator():
+        references[image] += 1
+        for variant in (variants or {}).get('variants', ()):
+            references[variant['name']] += 1
+    MediaBlob.objects.bulk_create(
+        [MediaBlob(name=name, refcount=count)
+         for name, count in references.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_imagejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Файл')),
+                ('refcount', models.PositiveIntegerField(default=0, verbose_name='Число ссылок')),
+            ],
+            options={
+                'verbose_name': 'медиафайл',
+                'verbose_name_plural': 'Медиафайлы',
+            },
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=blog.storage.ContentAddressedStorage(), upload_to='images', verbose_name='Фото'),
+        ),
+        migrations.RunPython(
+            count_media_references, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 3.2.16 on 2026-10-17 06:23
+
+from django.db import migrations, models
+
+
+def index_comments(apps, schema_editor):
+    # Пересоздаёт таблицу FTS5 с колонкой comments; вес заголовка
+    # в bm25 выше, чем у текста и комментариев.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS blog_post_fts')
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE blog_post_fts USING fts5("
+        "title, text, comments, "
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        "INSERT INTO blog_post_fts(blog_post_fts, rank) "
+        "VALUES ('rank', 'bm25(10.0, 5.0, 1.0)')"
+    )
+    schema_editor.execute(
+        'INSERT INTO blog_post_fts(rowid, title, text, comments) '
+        'SELECT p.id, p.title, p.text, '
+        '(SELECT group_concat(c.text, char(10)) FROM blog_comment c '
+        'WHERE c.post_id = p.id) FROM blog_post p'
+    )
+
+
+def drop_comments(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS blog_post_fts')
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE blog_post_fts USING fts5("
+        "title, text, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        'INSERT INTO blog_post_fts(rowid, title, text) '
+        'SELECT id, title, text FROM blog_post'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_post_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchIndexState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True, verbose_name='Индекс')),
+                ('last_id', models.BigIntegerField(default=0, verbose_name='Последняя публикация')),
+                ('since', models.DateTimeField(blank=True, null=True, verbose_name='Изменения с')),
+                ('run_started_at', models.DateTimeField(blank=True, null=True, verbose_name='Проход начат')),
+                ('indexed_until', models.DateTimeField(blank=True, null=True, verbose_name='Проиндексировано по')),
+            ],
+            options={
+                'verbose_name': 'состояние поискового индекса',
+                'verbose_name_plural': 'Состояние поискового индекса',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['created_at'], name='comment_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['updated_at'], name='post_updated_idx'),
+        ),
+        migrations.RunPython(index_comments, drop_comments),
+    ]
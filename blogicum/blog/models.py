@@ -1,6 +1,11 @@
+from collections import Counter, defaultdict
+
 from django.db import models
+from django.db.models.functions import Greatest
 from django.contrib.auth import get_user_model
 
+from .storage import ContentAddressedStorage
+
 User = get_user_model()
 
 
@@ -83,20 +88,74 @@ class Post(models.Model):
                   'чтобы скрыть публикацию.'
     )
 
-    image = models.ImageField('Фото', upload_to='images', blank=True)
+    image = models.ImageField(
+        'Фото',
+        upload_to='images',
+        blank=True,
+        storage=ContentAddressedStorage()
+    )
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Уменьшенные копии фото'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Добавлено'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                condition=models.Q(is_published=True),
+                name='post_published_feed_idx',
+            ),
+            models.Index(
+                fields=['category', '-pub_date', '-id'],
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_feed_idx',
+            ),
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='post_pub_date_idx',
+            ),
+            models.Index(fields=['updated_at'], name='post_updated_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    @property
+    def media_names(self):
+        return post_media_names(self.image.name, self.image_variants)
+
+
+def post_media_names(image_name, image_variants):
+    names = {
+        variant['name']
+        for variant in (image_variants or {}).get('variants', ())
+    }
+    if image_name:
+        names.add(image_name)
+    return names
+
 
 class Comment(models.Model):
     text = models.TextField(verbose_name='Текст')
@@ -119,3 +178,118 @@ class Comment(models.Model):
         verbose_name = 'комментарий'
         verbose_name_plural = 'комментарии'
         ordering = ('created_at',)
+        indexes = [
+            models.Index(
+                fields=['post', 'created_at'],
+                name='comment_post_created_idx',
+            ),
+            models.Index(fields=['created_at'], name='comment_created_idx'),
+        ]
+
+
+class ImageJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Обрабатывается'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    )
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Публикация',
+        related_name='image_jobs'
+    )
+    image_name = models.CharField(max_length=255, verbose_name='Файл')
+    status = models.CharField(
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        verbose_name='Статус'
+    )
+    claimed_by = models.CharField(
+        max_length=32, blank=True, verbose_name='Обработчик')
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Попыток')
+    error = models.TextField(blank=True, verbose_name='Ошибка')
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name='Добавлено'
+    )
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Изменено')
+
+    class Meta:
+        verbose_name = 'обработка фото'
+        verbose_name_plural = 'Обработка фото'
+        ordering = ('created_at',)
+        indexes = [
+            models.Index(
+                fields=['status', 'created_at'],
+                name='imagejob_queue_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.image_name} ({self.get_status_display()})'
+
+
+class MediaBlobManager(models.Manager):
+    def acquire(self, names):
+        names = set(names)
+        if not names:
+            return
+        self.bulk_create(
+            [self.model(name=name) for name in names],
+            ignore_conflicts=True,
+        )
+        self.filter(name__in=names).update(refcount=models.F('refcount') + 1)
+
+    def release(self, names):
+        # Повторы имени снимают по ссылке каждый: так освобождаются
+        # файлы сразу многих публикаций при массовом удалении.
+        by_count = defaultdict(list)
+        for name, count in Counter(names).items():
+            by_count[count].append(name)
+        for count, group in by_count.items():
+            self.filter(name__in=group, refcount__gt=0).update(
+                refcount=Greatest(models.F('refcount') - count, 0))
+
+
+class MediaBlob(models.Model):
+    name = models.CharField(max_length=255, unique=True, verbose_name='Файл')
+    refcount = models.PositiveIntegerField(
+        default=0, verbose_name='Число ссылок')
+
+    objects = MediaBlobManager()
+
+    class Meta:
+        verbose_name = 'медиафайл'
+        verbose_name_plural = 'Медиафайлы'
+
+    def __str__(self):
+        return self.name
+
+
+class SearchIndexState(models.Model):
+    # Контрольная точка reindex_search: прерванный проход продолжается
+    # с last_id, а инкрементальный берёт изменения с indexed_until.
+    name = models.CharField(max_length=64, unique=True, verbose_name='Индекс')
+    last_id = models.BigIntegerField(
+        default=0, verbose_name='Последняя публикация')
+    since = models.DateTimeField(
+        null=True, blank=True, verbose_name='Изменения с')
+    run_started_at = models.DateTimeField(
+        null=True, blank=True, verbose_name='Проход начат')
+    indexed_until = models.DateTimeField(
+        null=True, blank=True, verbose_name='Проиндексировано по')
+
+    class Meta:
+        verbose_name = 'состояние поискового индекса'
+        verbose_name_plural = 'Состояние поискового индекса'
+
+    def __str__(self):
+        return self.name
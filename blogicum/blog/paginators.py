@@ -0,0 +1,152 @@
+import base64
+import json
+from collections.abc import Sequence
+from types import SimpleNamespace
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .counters import get_feed_count
+
+
+class FeedPaginator(Paginator):
+    def __init__(self, object_list, per_page, count_key=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_key = count_key
+
+    @cached_property
+    def count(self):
+        if self.count_key is None:
+            return super().count
+        return get_feed_count(self.count_key, self.object_list)
+
+
+class KeysetPage(Sequence):
+    def __init__(self, object_list, paginator,
+                 next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+
+class KeysetPaginator:
+    # Записи идут по убыванию key_fields, последнее поле уникально:
+    # страница выбирается условием на ключ соседней записи и LIMIT,
+    # поэтому любая страница стоит столько же, сколько первая.
+
+    def __init__(self, object_list, per_page, key_fields=('pub_date', 'id'),
+                 count_key=None):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.count_key = count_key
+        self.key_fields = tuple(key_fields)
+        self._fields = [self._key_field(name) for name in self.key_fields]
+
+    def _key_field(self, name):
+        # Ключом может быть и аннотация, например ранг поиска.
+        annotation = self.object_list.query.annotations.get(name)
+        if annotation is None:
+            return self.object_list.model._meta.get_field(name)
+        field = annotation.output_field.clone()
+        field.set_attributes_from_name(name)
+        return field
+
+    @cached_property
+    def count(self):
+        if self.count_key is None:
+            return self.object_list.order_by().count()
+        return get_feed_count(self.count_key, self.object_list)
+
+    def encode_cursor(self, obj):
+        if isinstance(obj, dict):
+            # Строка из .values(): value_to_string читает атрибуты.
+            obj = SimpleNamespace(**{
+                field.attname: obj[name]
+                for name, field in zip(self.key_fields, self._fields)
+            })
+        values = [field.value_to_string(obj) for field in self._fields]
+        raw = json.dumps(values, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if len(values) != len(self._fields):
+                return None
+            return [
+                field.to_python(value)
+                for field, value in zip(self._fields, values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            return None
+
+    def _seek(self, values, lookup):
+        condition = Q()
+        for i, name in enumerate(self.key_fields):
+            equal = {
+                self.key_fields[j]: values[j] for j in range(i)
+            }
+            condition |= Q(**equal, **{f'{name}__{lookup}': values[i]})
+        return condition
+
+    def _ordered(self, descending=True):
+        prefix = '-' if descending else ''
+        return self.object_list.order_by(
+            *(f'{prefix}{name}' for name in self.key_fields)
+        )
+
+    def get_page(self, after=None, before=None):
+        after = self.decode_cursor(after) if after else None
+        before = self.decode_cursor(before) if before else None
+
+        if before is not None:
+            rows = list(
+                self._ordered(descending=False)
+                .filter(self._seek(before, 'gt'))[:self.per_page + 1]
+            )
+            if not rows:
+                return self.get_page()
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            has_next = True
+        else:
+            queryset = self._ordered()
+            if after is not None:
+                queryset = queryset.filter(self._seek(after, 'lt'))
+            rows = list(queryset[:self.per_page + 1])
+            has_next = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            has_previous = after is not None
+
+        if not rows:
+            return KeysetPage(rows, self)
+        return KeysetPage(
+            rows,
+            self,
+            next_cursor=self.encode_cursor(rows[-1]) if has_next else None,
+            previous_cursor=(
+                self.encode_cursor(rows[0]) if has_previous else None
+            ),
+        )
@@ -0,0 +1,56 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Допустимое отставание реплики, секунды.
+REPLICA_LAG = getattr(settings, 'BLOG_REPLICA_LAG', 10)
+
+# Текущий запрос выставляет ReplicaMiddleware; request.read_from_replica
+# он же отмечает перед вызовом помеченного представления.
+current_request = ContextVar('blog_current_request', default=None)
+
+
+def replica_aliases():
+    return getattr(settings, 'BLOG_DB_REPLICAS', [
+        alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS])
+
+
+def reads_from_replica():
+    request = current_request.get()
+    return getattr(request, 'read_from_replica', False)
+
+
+def use_primary():
+    # Дальнейшие чтения текущего запроса идут в основную базу.
+    request = current_request.get()
+    if request is not None:
+        request.read_from_replica = False
+
+
+def read_from_replica(view):
+    # Пометка для функций-представлений; у классов — атрибут
+    # read_from_replica = True.
+    view.read_from_replica = True
+    return view
+
+
+class PrimaryReplicaRouter:
+    # Чтение идёт в реплику только внутри представлений, помеченных
+    # read_from_replica, и вне транзакций; всё остальное — формы,
+    # комментарии, админка, команды — работает с основной базой.
+
+    def db_for_read(self, model, **hints):
+        aliases = replica_aliases()
+        if (not aliases or not reads_from_replica()
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        return random.choice(aliases)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же строки, что и основная база.
+        return True
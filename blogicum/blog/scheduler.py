@@ -0,0 +1,124 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import request_started
+from django.db import close_old_connections
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+NEXT_PUBLICATION_KEY = 'blog:scheduler:next-publication'
+LAST_RUN_KEY = 'blog:scheduler:last-run'
+
+SCHEDULER_LOOKBACK = getattr(
+    settings, 'BLOG_SCHEDULER_LOOKBACK', timedelta(hours=1))
+SCHEDULER_TIMER = getattr(settings, 'BLOG_SCHEDULER_TIMER', False)
+
+# Отправляется, когда наступила pub_date отложенных публикаций.
+# Аргументы: sender=Post, posts — список только что видимых публикаций.
+post_became_visible = Signal()
+
+_timer = None
+_timer_lock = threading.Lock()
+
+
+def next_publication():
+    timestamp = cache.get(NEXT_PUBLICATION_KEY)
+    if timestamp is None or 0 < timestamp <= time.time():
+        pub_date = (
+            Post.objects.filter(pub_date__gt=timezone.now())
+            .order_by('pub_date')
+            .values_list('pub_date', flat=True)
+            .first()
+        )
+        timestamp = pub_date.timestamp() if pub_date else 0
+        cache.set(NEXT_PUBLICATION_KEY, timestamp, None)
+    if not timestamp:
+        return None
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+
+def seconds_until_next_publication():
+    pub_date = next_publication()
+    if pub_date is None:
+        return None
+    return max(int((pub_date - timezone.now()).total_seconds()), 0)
+
+
+def safe_ttl(timeout):
+    # Отложенная публикация появляется в лентах без сохранения модели,
+    # поэтому кэши не должны жить дольше, чем до ближайшей pub_date.
+    seconds = seconds_until_next_publication()
+    if seconds is None:
+        return timeout
+    if timeout is None:
+        return seconds
+    return min(timeout, seconds)
+
+
+def release_due_posts(now=None):
+    now = now or timezone.now()
+    since = cache.get(LAST_RUN_KEY) or now - SCHEDULER_LOOKBACK
+    posts = list(
+        Post.objects.filter(pub_date__gt=since, pub_date__lte=now)
+        .order_by('pub_date')
+    )
+    cache.set(LAST_RUN_KEY, now, None)
+    cache.delete(NEXT_PUBLICATION_KEY)
+    if posts:
+        post_became_visible.send(sender=Post, posts=posts)
+    return posts
+
+
+def release_if_due():
+    # Без таймера отложенные публикации выпускаются первым запросом
+    # после наступления pub_date; в остальное время — одно чтение кэша.
+    timestamp = cache.get(NEXT_PUBLICATION_KEY)
+    if timestamp is not None and not 0 < timestamp <= time.time():
+        return []
+    posts = release_due_posts()
+    next_publication()
+    return posts
+
+
+def post_schedule_changed():
+    cache.delete(NEXT_PUBLICATION_KEY)
+    if _timer is not None:
+        start_timer()
+
+
+def _on_timer():
+    try:
+        release_due_posts()
+    except Exception:
+        logger.exception('Не удалось обработать отложенные публикации')
+    finally:
+        close_old_connections()
+    start_timer()
+
+
+def start_timer():
+    global _timer
+    with _timer_lock:
+        if _timer is not None:
+            _timer.cancel()
+        delay = seconds_until_next_publication()
+        if delay is None:
+            _timer = None
+            return
+        _timer = threading.Timer(delay + 1, _on_timer)
+        _timer.daemon = True
+        _timer.start()
+
+
+def start_timer_on_first_request(sender, **kwargs):
+    request_started.disconnect(
+        start_timer_on_first_request, dispatch_uid='blog.scheduler')
+    start_timer()
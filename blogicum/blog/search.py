@@ -0,0 +1,218 @@
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+
+SEARCH_BACKEND = getattr(settings, 'BLOG_SEARCH_BACKEND', None)
+SEARCH_MAX_TERMS = getattr(settings, 'BLOG_SEARCH_MAX_TERMS', 8)
+SNIPPET_WORDS = getattr(settings, 'BLOG_SEARCH_SNIPPET_WORDS', 24)
+
+FTS_TABLE = 'blog_post_fts'
+
+# Границы совпадения в сниппете: управляющие символы не встречаются
+# в тексте публикаций и переживают экранирование HTML.
+MARK_START = '\x02'
+MARK_END = '\x03'
+
+
+def search_terms(query):
+    return re.findall(r'\w+', query or '')[:SEARCH_MAX_TERMS]
+
+
+def mark_snippet(snippet):
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+def python_snippet(text, terms):
+    words = text.split()
+    lowered = [term.lower() for term in terms]
+
+    def matches(word):
+        word = word.lower()
+        return any(term in word for term in lowered)
+
+    first = next((i for i, word in enumerate(words) if matches(word)), 0)
+    start = max(first - SNIPPET_WORDS // 4, 0)
+    window = words[start:start + SNIPPET_WORDS]
+    snippet = ' '.join(
+        f'{MARK_START}{word}{MARK_END}' if matches(word) else word
+        for word in window
+    )
+    if start > 0:
+        snippet = '…' + snippet
+    if start + SNIPPET_WORDS < len(words):
+        snippet += '…'
+    return snippet
+
+
+class SimpleSearchBackend:
+    # Запасной вариант без индекса: LIKE по заголовку и тексту.
+
+    def index_posts(self, post_ids):
+        pass
+
+    def remove_posts(self, post_ids):
+        pass
+
+    def prune(self):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def filter(self, queryset, query):
+        terms = search_terms(query)
+        if not terms:
+            return queryset.none()
+        for term in terms:
+            queryset = queryset.filter(
+                Q(title__icontains=term) | Q(text__icontains=term))
+        return queryset
+
+    def score(self, query):
+        return Value(0.0, output_field=FloatField())
+
+    def search(self, queryset, query):
+        return self.filter(queryset, query).annotate(
+            search_score=self.score(query))
+
+    def highlight(self, posts, query):
+        terms = search_terms(query)
+        for post in posts:
+            post.search_snippet = mark_snippet(
+                python_snippet(post.text, terms))
+        return posts
+
+
+class SQLiteSearchBackend(SimpleSearchBackend):
+    # Индекс — виртуальная таблица FTS5 (миграция 0014) с rowid, равным
+    # id публикации; синхронизируется сигналами в blog/signals.py.
+    # Видимость проверяется по blog_post, в индексе лежат все публикации.
+
+    def match_expression(self, query):
+        # Каждое слово — префиксный поиск в кавычках, поэтому синтаксис
+        # FTS5 во вводе пользователя не интерпретируется.
+        return ' '.join(f'"{term}"*' for term in search_terms(query))
+
+    def _document_sql(self, where=''):
+        # Текст комментариев индексируется вместе с публикацией.
+        return (
+            f'INSERT INTO {FTS_TABLE}(rowid, title, text, comments) '
+            f'SELECT p.id, p.title, p.text, '
+            f'(SELECT group_concat(c.text, char(10)) FROM blog_comment c '
+            f'WHERE c.post_id = p.id) FROM blog_post p {where}'
+        )
+
+    def index_posts(self, post_ids, remove=False):
+        post_ids = list(post_ids)
+        if not post_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(post_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})',
+                post_ids)
+            if not remove:
+                cursor.execute(
+                    self._document_sql(f'WHERE p.id IN ({placeholders})'),
+                    post_ids)
+
+    def remove_posts(self, post_ids):
+        self.index_posts(post_ids, remove=True)
+
+    def prune(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} '
+                f'WHERE rowid NOT IN (SELECT id FROM blog_post)')
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(self._document_sql())
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+
+    def filter(self, queryset, query):
+        expression = self.match_expression(query)
+        if not expression:
+            return queryset.none()
+        return queryset.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            [expression]))
+
+    def score(self, query):
+        # rank в FTS5 — bm25, чем меньше, тем лучше; знак меняется,
+        # чтобы курсорная пагинация шла по убыванию, как в лентах.
+        return RawSQL(
+            f'SELECT -rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'AND rowid = "blog_post"."id"',
+            [self.match_expression(query)], output_field=FloatField())
+
+    def highlight(self, posts, query):
+        expression = self.match_expression(query)
+        if not posts or not expression:
+            return posts
+        placeholders = ', '.join(['%s'] * len(posts))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, snippet({FTS_TABLE}, -1, %s, %s, %s, %s) '
+                f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'AND rowid IN ({placeholders})',
+                [MARK_START, MARK_END, '…', SNIPPET_WORDS, expression,
+                 *(post.pk for post in posts)])
+            snippets = dict(cursor.fetchall())
+        for post in posts:
+            post.search_snippet = mark_snippet(snippets.get(post.pk, ''))
+        return posts
+
+
+class PostgreSQLSearchBackend(SimpleSearchBackend):
+    # Полнотекстовый поиск PostgreSQL; для больших таблиц нужен
+    # GIN-индекс по тому же выражению to_tsvector.
+    config = 'russian'
+
+    def _vector_and_query(self, query):
+        from django.contrib.postgres.search import SearchQuery, SearchVector
+
+        vector = (
+            SearchVector('title', weight='A', config=self.config)
+            + SearchVector('text', weight='B', config=self.config)
+        )
+        return vector, SearchQuery(
+            ' '.join(search_terms(query)), config=self.config)
+
+    def filter(self, queryset, query):
+        if not search_terms(query):
+            return queryset.none()
+        vector, search_query = self._vector_and_query(query)
+        return queryset.annotate(search_vector=vector).filter(
+            search_vector=search_query)
+
+    def score(self, query):
+        from django.contrib.postgres.search import SearchRank
+
+        return SearchRank(*self._vector_and_query(query))
+
+
+BACKENDS = {
+    'sqlite': 'blog.search.SQLiteSearchBackend',
+    'postgresql': 'blog.search.PostgreSQLSearchBackend',
+}
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    path = SEARCH_BACKEND or BACKENDS.get(
+        connection.vendor, 'blog.search.SimpleSearchBackend')
+    return import_string(path)()
@@ -0,0 +1,247 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import counters, scheduler
+from .cache import (invalidate_post_cards, invalidate_tags, post_page_tags,
+                    post_sitemap_tags, sitemap_category_tag)
+from .models import (Category, Comment, Location, MediaBlob, Post, User,
+                     post_media_names)
+from .jobs import enqueue_image_job
+from .search import get_search_backend
+
+
+def _adjust_comment_count(post_id, delta):
+    # Комментарии входят в поисковый документ публикации: updated_at
+    # отмечает её для reindex_search --incremental.
+    if post_id is not None:
+        Post.objects.filter(pk=post_id).update(
+            comment_count=F('comment_count') + delta,
+            updated_at=timezone.now())
+
+
+def _reset_changed_image(instance, image_name, image_variants):
+    # Копии и очищенный от EXIF оригинал относятся к прежнему фото, кто бы
+    # его ни заменил: форма, админка или код. Обработчик задания меняет
+    # имя фото вместе с копиями, и это заменой не считается.
+    instance._image_changed = (
+        (instance.image.name or '') != (image_name or '')
+        and instance.image_variants == image_variants
+    )
+    if instance._image_changed:
+        instance.image_variants = {'pending': True} if instance.image else {}
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_post(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = None
+    if instance.pk is not None:
+        previous = (
+            Post.objects.filter(pk=instance.pk)
+            .values_list('category_id', 'author_id', 'image',
+                         'image_variants', 'pub_date')
+            .first()
+        )
+    if previous is None:
+        _reset_changed_image(instance, '', {})
+        return
+    instance._previous_feeds = previous[:2]
+    instance._previous_media = post_media_names(*previous[2:4])
+    instance._previous_sitemap = (previous[0], previous[4])
+    _reset_changed_image(instance, *previous[2:4])
+
+
+@receiver(post_save, sender=Post)
+def count_post_media(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    current = instance.media_names
+    previous = getattr(instance, '_previous_media', set())
+    MediaBlob.objects.acquire(current - previous)
+    MediaBlob.objects.release(previous - current)
+    instance._previous_media = current
+
+
+@receiver(post_delete, sender=Post)
+def release_post_media(sender, instance, **kwargs):
+    MediaBlob.objects.release(instance.media_names)
+
+
+@receiver(post_save, sender=Post)
+def index_saved_post(sender, instance, **kwargs):
+    get_search_backend().index_posts([instance.pk])
+
+
+@receiver(post_delete, sender=Post)
+def remove_deleted_post_from_index(sender, instance, **kwargs):
+    get_search_backend().remove_posts([instance.pk])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feed_counts(sender, instance, **kwargs):
+    keys = counters.post_feed_keys(instance.category_id, instance.author_id)
+    previous = getattr(instance, '_previous_feeds', None)
+    if previous:
+        keys += counters.post_feed_keys(*previous)
+    counters.invalidate_feed_counts(*set(keys))
+    counters.invalidate_query_counts(sender)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    tags = post_page_tags(
+        instance.pk, instance.category_id, instance.author_id)
+    previous = getattr(instance, '_previous_feeds', None)
+    if previous:
+        tags += post_page_tags(instance.pk, *previous)
+    tags += post_sitemap_tags(instance.category_id, instance.pub_date)
+    previous_sitemap = getattr(instance, '_previous_sitemap', None)
+    if previous_sitemap:
+        tags += post_sitemap_tags(*previous_sitemap)
+    invalidate_tags(*set(tags))
+    scheduler.post_schedule_changed()
+
+
+@receiver(post_save, sender=Post)
+def process_changed_image(sender, instance, raw=False, **kwargs):
+    # Подключён после подсчёта ссылок на файлы: при IMAGE_JOBS_INLINE
+    # задание сохраняет публикацию повторно уже с новыми именами.
+    if raw or not getattr(instance, '_image_changed', False):
+        return
+    instance._image_changed = False
+    if instance.image:
+        enqueue_image_job(instance)
+
+
+@receiver(scheduler.post_became_visible)
+def refresh_published_feeds(sender, posts, **kwargs):
+    keys = []
+    tags = []
+    for post in posts:
+        keys += counters.post_feed_keys(post.category_id, post.author_id)
+        tags += post_page_tags(post.pk, post.category_id, post.author_id)
+        tags += post_sitemap_tags(post.category_id, post.pub_date)
+    counters.invalidate_feed_counts(*set(keys))
+    invalidate_tags(*set(tags))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_feed_counts(sender, **kwargs):
+    counters.invalidate_all_feed_counts()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_sitemaps(sender, instance, **kwargs):
+    invalidate_tags('sitemap', sitemap_category_tag(instance.pk))
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    instance._previous_post_id = (
+        Comment.objects.filter(pk=instance.pk)
+        .values_list('post_id', flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        _adjust_comment_count(instance.post_id, 1)
+        return
+    previous_post_id = getattr(instance, '_previous_post_id', None)
+    if previous_post_id != instance.post_id:
+        _adjust_comment_count(previous_post_id, -1)
+        _adjust_comment_count(instance.post_id, 1)
+    else:
+        # Правка текста: счётчик прежний, обновляется только updated_at.
+        _adjust_comment_count(instance.post_id, 0)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    _adjust_comment_count(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_query_counts(sender, **kwargs):
+    counters.invalidate_query_counts(sender)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def index_comment_post(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    post_ids = {
+        instance.post_id, getattr(instance, '_previous_post_id', None)}
+    get_search_backend().index_posts(post_ids - {None})
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    post_ids = {
+        instance.post_id, getattr(instance, '_previous_post_id', None)}
+    tags = []
+    for post_id, category_id, author_id in Post.objects.filter(
+            pk__in=post_ids - {None}).values_list(
+            'pk', 'category_id', 'author_id'):
+        tags += post_page_tags(post_id, category_id, author_id)
+    if tags:
+        invalidate_tags(*set(tags))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_cards_for_related(sender, instance, **kwargs):
+    invalidate_post_cards()
+    invalidate_tags(f'{sender._meta.model_name}:{instance.pk}', 'cards')
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, raw=False, update_fields=None,
+                      **kwargs):
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    instance._previous_username = (
+        User.objects.filter(pk=instance.pk)
+        .values_list('username', flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_pages(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    tags = [f'user:{instance.pk}']
+    previous = getattr(instance, '_previous_username', None)
+    if previous is not None and previous != instance.username:
+        invalidate_post_cards()
+        tags.append('cards')
+    invalidate_tags(*tags)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user_pages(sender, instance, **kwargs):
+    invalidate_post_cards()
+    invalidate_tags(f'user:{instance.pk}', 'cards')
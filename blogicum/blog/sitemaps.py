@@ -0,0 +1,178 @@
+import glob
+import hashlib
+import os
+import tempfile
+from contextlib import suppress
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Max
+from django.db.models.functions import TruncMonth
+from django.http import FileResponse, Http404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.xmlutils import SimplerXMLGenerator
+from django.views.decorators.http import require_safe
+
+from . import scheduler
+from .cache import (changed_within_lag, get_tag_versions,
+                    sitemap_category_tag, sitemap_shard_tag)
+from .routers import read_from_replica, use_primary
+from .views import get_posts_with_filters
+
+SITEMAP_ROOT = getattr(
+    settings, 'BLOG_SITEMAP_ROOT', os.path.join(settings.BASE_DIR, 'sitemaps'))
+# Адреса в карте берутся из настройки, а не из запроса: файлы карты
+# отдаются всем, и заголовок Host одного запроса не должен в них попасть.
+SITE_URL = getattr(
+    settings, 'BLOG_SITE_URL', 'http://localhost:8000').rstrip('/')
+SITEMAP_NAMESPACE = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+# Карта сайта разбита на части «категория × месяц pub_date»: поисковик
+# получает все адреса публикаций без обхода пагинации. Части и индекс
+# хранятся файлами, имя которых содержит версии тегов кэша: сигналы
+# сбрасывают теги изменённых частей (blog/signals.py), и при следующем
+# запросе пересобираются только они.
+
+
+def _month_bounds(year, month):
+    start = timezone.make_aware(datetime(year, month, 1))
+    end = timezone.make_aware(
+        datetime(year + month // 12, month % 12 + 1, 1))
+    return start, end
+
+
+def _lastmod(*values):
+    return max(value for value in values if value is not None).isoformat()
+
+
+def absolute_url(path):
+    return f'{SITE_URL}{path}'
+
+
+def _versioned_path(name, tags):
+    versions = get_tag_versions(tags)
+    if changed_within_lag(versions):
+        # Файл живёт до следующего сброса тегов: собирается из
+        # основной базы, пока реплика может отставать.
+        use_primary()
+    digest = hashlib.md5(
+        ';'.join([SITE_URL, *(
+            f'{tag}={versions[tag]}' for tag in sorted(versions))])
+        .encode()).hexdigest()[:16]
+    return os.path.join(SITEMAP_ROOT, f'{name}.{digest}.xml')
+
+
+def _write_atomic(path, write):
+    # Файл пишется во временный и переименовывается: параллельный
+    # запрос не увидит недописанную карту. Прежние версии удаляются.
+    # Имя временного файла уникально: потоки одного процесса, собирающие
+    # одну часть, не пишут в общий файл.
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    stem = path.rsplit('.', 2)[0]
+    fd, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            handler = SimplerXMLGenerator(file, 'utf-8')
+            handler.startDocument()
+            write(handler)
+        os.replace(temporary, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.remove(temporary)
+        raise
+    for stale in glob.glob(glob.escape(stem) + '.*.xml'):
+        if stale != path:
+            with suppress(FileNotFoundError):
+                os.remove(stale)
+
+
+def _visible_posts():
+    return get_posts_with_filters(apply_filters=True).order_by()
+
+
+def write_index(handler):
+    shards = (
+        _visible_posts()
+        .annotate(month=TruncMonth('pub_date'))
+        .values('category_id', 'month')
+        .annotate(updated=Max('updated_at'), published=Max('pub_date'))
+        .order_by('category_id', 'month')
+    )
+    handler.startElement('sitemapindex', {'xmlns': SITEMAP_NAMESPACE})
+    for shard in shards.iterator():
+        month = shard['month']
+        location = absolute_url(reverse(
+            'blog:sitemap_shard',
+            args=[shard['category_id'], month.year, month.month]))
+        handler.startElement('sitemap', {})
+        handler.addQuickElement('loc', location)
+        handler.addQuickElement(
+            'lastmod', _lastmod(shard['updated'], shard['published']))
+        handler.endElement('sitemap')
+    handler.endElement('sitemapindex')
+
+
+def shard_posts(category_id, year, month):
+    start, end = _month_bounds(year, month)
+    return _visible_posts().filter(
+        category_id=category_id, pub_date__gte=start, pub_date__lt=end)
+
+
+def write_shard(handler, category_id, year, month):
+    rows = (
+        shard_posts(category_id, year, month)
+        .order_by('pub_date', 'id')
+        .values_list('id', 'pub_date', 'updated_at')
+    )
+    handler.startElement('urlset', {'xmlns': SITEMAP_NAMESPACE})
+    for post_id, pub_date, updated_at in rows.iterator():
+        handler.startElement('url', {})
+        handler.addQuickElement('loc', absolute_url(
+            reverse('blog:post_detail', args=[post_id])))
+        handler.addQuickElement('lastmod', _lastmod(pub_date, updated_at))
+        handler.endElement('url')
+    handler.endElement('urlset')
+
+
+def _serve(request, path, write):
+    if not os.path.exists(path):
+        _write_atomic(path, write)
+    mtime = int(os.stat(path).st_mtime)
+    response = get_conditional_response(request, last_modified=mtime)
+    if response is None:
+        response = FileResponse(
+            open(path, 'rb'), content_type='application/xml')
+    response['Last-Modified'] = http_date(mtime)
+    return response
+
+
+@read_from_replica
+@require_safe
+def sitemap_index(request):
+    scheduler.release_if_due()
+    path = _versioned_path('index', ['sitemap'])
+    return _serve(
+        request, path, write_index)
+
+
+@read_from_replica
+@require_safe
+def sitemap_shard(request, category_id, year, month):
+    if not (1 <= month <= 12 and 1 <= year < 9999):
+        raise Http404
+    scheduler.release_if_due()
+    start = _month_bounds(year, month)[0]
+    path = _versioned_path(
+        os.path.join(str(category_id), f'{year:04d}-{month:02d}'),
+        [sitemap_shard_tag(category_id, start),
+         sitemap_category_tag(category_id)])
+    # Пустые части не записываются, иначе любой адрес создавал бы файл.
+    if (not os.path.exists(path)
+            and not shard_posts(category_id, year, month).exists()):
+        raise Http404
+    return _serve(request, path, lambda handler: write_shard(
+        handler, category_id, year, month))
@@ -0,0 +1,85 @@
+from datetime import date
+
+from django import template
+from django.utils import formats
+from django.utils.text import capfirst
+from django.utils.translation import gettext as _
+
+from blog.changelist import date_bounds, next_period, nonempty_periods
+
+register = template.Library()
+
+
+def _date_lookups(cl, field_name):
+    lookups = []
+    for part in ('year', 'month', 'day'):
+        value = cl.params.get(f'{field_name}__{part}')
+        if not value:
+            break
+        lookups.append(int(value))
+    if lookups:
+        return lookups
+    # Как в Django: если все записи в одном году или месяце, иерархия
+    # сразу открывается на нём.
+    first, last = date_bounds(cl.queryset, field_name)
+    if first is not None and first.year == last.year:
+        lookups = [first.year]
+        if first.month == last.month:
+            lookups.append(first.month)
+    return lookups
+
+
+@register.inclusion_tag('admin/date_hierarchy.html')
+def indexed_date_hierarchy(cl):
+    # Повторяет date_hierarchy из django.contrib.admin, но периоды
+    # ищутся по индексу поля (см. blog.changelist).
+    field_name = cl.date_hierarchy
+    try:
+        lookups = _date_lookups(cl, field_name)
+    except ValueError:
+        return {'show': False}
+
+    def link(*values):
+        parts = ('year', 'month', 'day')
+        return cl.get_query_string(
+            {f'{field_name}__{part}': value
+             for part, value in zip(parts, values)},
+            [f'{field_name}__'])
+
+    def choices(kind, fmt, start=None, end=None):
+        periods = nonempty_periods(cl.queryset, field_name, kind, start, end)
+        return [{
+            'link': link(*lookups, getattr(period, kind)),
+            'title': (str(period.year) if fmt is None else
+                      capfirst(formats.date_format(period, fmt))),
+        } for period in periods]
+
+    if len(lookups) == 3:
+        day = date(*lookups)
+        return {
+            'show': True,
+            'back': {
+                'link': link(*lookups[:2]),
+                'title': capfirst(formats.date_format(
+                    day, 'YEAR_MONTH_FORMAT')),
+            },
+            'choices': [{'title': capfirst(formats.date_format(
+                day, 'MONTH_DAY_FORMAT'))}],
+        }
+    if len(lookups) == 2:
+        month = date(*lookups, 1)
+        return {
+            'show': True,
+            'back': {'link': link(lookups[0]), 'title': str(lookups[0])},
+            'choices': choices('day', 'MONTH_DAY_FORMAT', month,
+                               next_period(month, 'month')),
+        }
+    if len(lookups) == 1:
+        year = date(lookups[0], 1, 1)
+        return {
+            'show': True,
+            'back': {'link': link(), 'title': _('All dates')},
+            'choices': choices('month', 'YEAR_MONTH_FORMAT', year,
+                               next_period(year, 'year')),
+        }
+    return {'show': True, 'back': None, 'choices': choices('year', None)}
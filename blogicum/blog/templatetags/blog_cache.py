@@ -0,0 +1,17 @@
+from django import template
+
+from blog.cache import post_card_generation, post_card_key
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def post_card_cache_key(context, post):
+    request = context.get('request')
+    if request is None:
+        return post_card_key(post, post_card_generation())
+    # Поколение читается из кэша один раз на запрос, а не на каждую карточку.
+    if not hasattr(request, '_post_card_generation'):
+        request._post_card_generation = post_card_generation()
+    return post_card_key(
+        post, request._post_card_generation, getattr(request, 'user', None))
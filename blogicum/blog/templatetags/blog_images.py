@@ -0,0 +1,36 @@
+from django import template
+
+from blog.images import IMAGE_DEFAULT_WIDTH
+
+register = template.Library()
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, sizes='(max-width: 40rem) 100vw, 40rem'):
+    info = post.image_variants or {}
+    if info.get('pending'):
+        return {'pending': True}
+    storage = post.image.storage
+    variants = info.get('variants', [])
+    srcset = [
+        f"{storage.url(variant['name'])} {variant['width']}w"
+        for variant in variants
+    ]
+    if srcset and info.get('width'):
+        srcset.append(f"{post.image.url} {info['width']}w")
+
+    src = post.image.url
+    if variants:
+        default = min(
+            variants,
+            key=lambda variant: abs(variant['width'] - IMAGE_DEFAULT_WIDTH))
+        src = storage.url(default['name'])
+
+    return {
+        'src': src,
+        'srcset': ', '.join(srcset),
+        'sizes': sizes,
+        'width': info.get('width'),
+        'height': info.get('height'),
+        'original_url': post.image.url,
+    }
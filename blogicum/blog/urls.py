@@ -1,15 +1,31 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import api, feeds, sitemaps, views
+from .async_views import async_view
 
 app_name = 'blog'
 
+# Адреса из BLOG_ASYNC_VIEWS обслуживаются асинхронными версиями
+# представлений (blog/async_views.py); имеет смысл только под ASGI.
+ASYNC_VIEWS = set(getattr(settings, 'BLOG_ASYNC_VIEWS', ()))
+
+
+def read_view(name, view_class):
+    if name in ASYNC_VIEWS:
+        return async_view(view_class)
+    return view_class.as_view()
+
+
 urlpatterns = [
-    path('', views.MainPostView.as_view(), name='index'),
-    path('posts/<int:post_id>/', views.PostDetailView.as_view(),
+    path('', read_view('index', views.MainPostView), name='index'),
+    path('posts/<int:post_id>/',
+         read_view('post_detail', views.PostDetailView),
          name='post_detail'),
-    path('category/<slug:category_slug>/', views.CategoryPostView.as_view(),
+    path('category/<slug:category_slug>/',
+         read_view('category_posts', views.CategoryPostView),
          name='category_posts'),
-    path('profile/<str:username>/', views.ProfileView.as_view(),
+    path('search/', views.SearchView.as_view(), name='search'),
+    path('profile/<str:username>/', read_view('profile', views.ProfileView),
          name='profile'),
     path('posts/create/', views.CreatePostView.as_view(),
          name='create_post'),
@@ -24,5 +40,46 @@ urlpatterns = [
     path('posts/<int:post_id>/edit_comment/<int:comment_id>/',
          views.CommentUpdateView.as_view(), name='edit_comment'),
     path('posts/<int:post_id>/delete_comment/<int:comment_id>/',
-         views.CommentDeleteView.as_view(), name='delete_comment')
+         views.CommentDeleteView.as_view(), name='delete_comment'),
+    path('api/posts/', api.IndexApiView.as_view(), name='api_index'),
+    path('api/posts/<int:post_id>/', api.PostApiView.as_view(),
+         name='api_post'),
+    path('api/category/<slug:category_slug>/',
+         api.CategoryApiView.as_view(), name='api_category'),
+    path('api/profile/<str:username>/', api.ProfileApiView.as_view(),
+         name='api_profile'),
+    path('feed/<str:kind>/', feeds.PostFeedView.as_view(), name='feed'),
+    path('category/<slug:category_slug>/feed/<str:kind>/',
+         feeds.CategoryFeedView.as_view(), name='category_feed'),
+    path('profile/<str:username>/feed/<str:kind>/',
+         feeds.ProfileFeedView.as_view(), name='profile_feed'),
+    path('sitemap.xml', sitemaps.sitemap_index, name='sitemap'),
+    path('sitemap/<int:category_id>/<int:year>-<int:month>.xml',
+         sitemaps.sitemap_shard, name='sitemap_shard'),
 ]
+
+# Максимальное число SQL-запросов на один запрос к адресу, включая
+# сессию и пользователя; проверяется в tests/test_query_budgets.py.
+query_budgets = {
+    'index': 5,
+    'post_detail': 4,
+    'category_posts': 6,
+    'profile': 6,
+    'search': 6,
+    'create_post': 4,
+    'edit_profile': 2,
+    'edit_post': 5,
+    'delete_post': 4,
+    'add_comment': 10,
+    'edit_comment': 3,
+    'delete_comment': 3,
+    'api_index': 3,
+    'api_post': 4,
+    'api_category': 4,
+    'api_profile': 4,
+    'feed': 4,
+    'category_feed': 5,
+    'profile_feed': 5,
+    'sitemap': 3,
+    'sitemap_shard': 4,
+}
@@ -1,52 +1,88 @@
-from django.db.models import Count
+from django.db import transaction
+from django.db.models import Prefetch, Q
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy, reverse
+from django.utils.http import urlencode
 from django.views.generic import (ListView, CreateView, UpdateView,
-                                  DetailView, DeleteView)
+                                  DetailView, DeleteView, TemplateView)
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.paginator import Paginator
-from .forms import UserUpdateForm, PostForm, CommentForm
+from .cache import AnonymousPageCacheMixin
+from .forms import UserUpdateForm, PostForm, CommentForm, SearchForm
 from .models import Category, Post, User, Comment
+from .counters import (author_feed_key, category_feed_key,
+                       published_feed_key)
+from .paginators import FeedPaginator, KeysetPaginator
+from .search import get_search_backend
 from django.utils import timezone
 
 
-def get_posts_with_filters(posts_queryset=None,
-                           apply_filters=True, add_comments=True):
+def published_posts_q():
+    return Q(
+        is_published=True,
+        pub_date__lte=timezone.now(),
+        category__is_published=True
+    )
+
+
+def get_posts_with_filters(posts_queryset=None, apply_filters=True):
     if posts_queryset is None:
         posts_queryset = Post.objects.all()
 
     if apply_filters:
-        posts_queryset = posts_queryset.filter(
-            is_published=True,
-            pub_date__lte=timezone.now(),
-            category__is_published=True
-        )
+        posts_queryset = posts_queryset.filter(published_posts_q())
 
     posts_queryset = posts_queryset.select_related(
         'author', 'category', 'location'
     )
 
-    if add_comments:
-        posts_queryset = posts_queryset.annotate(
-            comment_count=Count('comments')
-        )
-
     return posts_queryset
 
 
-def get_page_obj(queryset, request, paginate_by=10):
-    paginator = Paginator(queryset, paginate_by)
+def get_page_obj(queryset, request, paginate_by=10, keyset=False,
+                 count_key=None, key_fields=('pub_date', 'id')):
+    if keyset:
+        paginator = KeysetPaginator(
+            queryset, paginate_by, key_fields=key_fields,
+            count_key=count_key)
+        return paginator.get_page(
+            after=request.GET.get('after'),
+            before=request.GET.get('before'))
+
+    paginator = FeedPaginator(queryset, paginate_by, count_key=count_key)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
 
 
-class ProfileView(DetailView):
+class AuthorRequiredMixin:
+    post_id_attr = 'pk'
+
+    def get_object(self, queryset=None):
+        # Объект загружается один раз: и для проверки авторства,
+        # и для формы или удаления в UpdateView/DeleteView.
+        if not hasattr(self, '_author_object'):
+            self._author_object = super().get_object(queryset)
+        return self._author_object
+
+    def dispatch(self, request, *args, **kwargs):
+        obj = self.get_object()
+        if obj.author_id != request.user.id:
+            return redirect('blog:post_detail',
+                            post_id=getattr(obj, self.post_id_attr))
+        return super().dispatch(request, *args, **kwargs)
+
+
+class ProfileView(AnonymousPageCacheMixin, DetailView):
     model = User
     template_name = 'blog/profile.html'
+    read_from_replica = True
     slug_field = 'username'
     slug_url_kwarg = 'username'
     context_object_name = 'profile'
 
+    def get_cache_tags(self):
+        return [f'feed:author:{self.object.id}', f'user:{self.object.id}',
+                'cards']
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
@@ -57,14 +93,15 @@ class ProfileView(DetailView):
 
         queryset = get_posts_with_filters(
             queryset,
-            apply_filters=apply_filters,
-            add_comments=True
+            apply_filters=apply_filters
         ).order_by(*Post._meta.ordering)
 
         context['page_obj'] = get_page_obj(
             queryset,
             self.request,
-            paginate_by=10)
+            paginate_by=10,
+            keyset=True,
+            count_key=author_feed_key(user.id, own=not apply_filters))
 
         return context
 
@@ -85,32 +122,42 @@ class CreatePostView(LoginRequiredMixin, CreateView):
         })
 
 
-class MainPostView(ListView):
+class MainPostView(AnonymousPageCacheMixin, ListView):
     model = Post
     template_name = 'blog/index.html'
+    read_from_replica = True
+
+    def get_cache_tags(self):
+        return ['feed', 'cards']
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
         queryset = get_posts_with_filters(
-            apply_filters=True,
-            add_comments=True
+            apply_filters=True
         ).order_by(*Post._meta.ordering)
 
         context['page_obj'] = get_page_obj(
             queryset,
             self.request,
-            paginate_by=10)
+            paginate_by=10,
+            keyset=True,
+            count_key=published_feed_key())
 
         return context
 
 
-class CategoryPostView(DetailView):
+class CategoryPostView(AnonymousPageCacheMixin, DetailView):
     model = Category
     template_name = 'blog/category.html'
+    read_from_replica = True
     slug_url_kwarg = 'category_slug'
     context_object_name = 'category'
 
+    def get_cache_tags(self):
+        return [f'feed:category:{self.object.id}',
+                f'category:{self.object.id}', 'cards']
+
     def get_queryset(self):
         return Category.objects.filter(is_published=True)
 
@@ -121,15 +168,45 @@ class CategoryPostView(DetailView):
 
         queryset = get_posts_with_filters(
             posts,
-            apply_filters=True,
-            add_comments=True
+            apply_filters=True
         ).order_by(*Post._meta.ordering)
 
         context['page_obj'] = get_page_obj(
             queryset,
             self.request,
-            paginate_by=10)
+            paginate_by=10,
+            keyset=True,
+            count_key=category_feed_key(self.object.id))
+
+        return context
+
+
+class SearchView(TemplateView):
+    template_name = 'blog/search.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+
+        form = SearchForm(self.request.GET or None)
+        query = form.cleaned_data['q'].strip() if form.is_valid() else ''
+        context['form'] = form
+        context['query'] = query
+        if not query:
+            return context
+
+        backend = get_search_backend()
+        queryset = backend.search(
+            get_posts_with_filters(apply_filters=True), query)
+        page_obj = get_page_obj(
+            queryset,
+            self.request,
+            paginate_by=10,
+            keyset=True,
+            key_fields=('search_score', 'id'))
+        backend.highlight(page_obj.object_list, query)
 
+        context['page_obj'] = page_obj
+        context['pagination_query'] = urlencode({'q': query})
         return context
 
 
@@ -147,50 +224,56 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         })
 
 
-class PostDetailView(DetailView):
+class PostDetailView(AnonymousPageCacheMixin, DetailView):
     model = Post
     template_name = 'blog/detail.html'
+    read_from_replica = True
+
+    def get_cache_tags(self):
+        post = self.object
+        comment_authors = {
+            comment.author_id for comment in post.comments.all()}
+        return [
+            f'post:{post.id}',
+            f'category:{post.category_id}',
+            f'location:{post.location_id}',
+            *(f'user:{user_id}' for user_id in {post.author_id,
+                                                *comment_authors}),
+        ]
 
     def get_object(self):
-        post = get_object_or_404(Post, id=self.kwargs['post_id'])
-
-        if self.request.user == post.author:
-            return post
+        visible = published_posts_q()
+        if self.request.user.is_authenticated:
+            visible |= Q(author=self.request.user)
 
-        return get_object_or_404(
-            get_posts_with_filters(apply_filters=True, add_comments=False),
-            id=self.kwargs['post_id']
+        queryset = get_posts_with_filters(
+            apply_filters=False
+        ).filter(visible).prefetch_related(
+            Prefetch('comments',
+                     queryset=Comment.objects.select_related('author'))
         )
+        return get_object_or_404(queryset, id=self.kwargs['post_id'])
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comments.select_related('author')
+        context['comments'] = self.object.comments.all()
         return context
 
 
-class PostUpdateView(LoginRequiredMixin, UpdateView):
+class PostUpdateView(AuthorRequiredMixin, LoginRequiredMixin, UpdateView):
     model = Post
     form_class = PostForm
     template_name = 'blog/create.html'
     pk_url_kwarg = 'post_id'
 
-    def dispatch(self, request, *args, **kwargs):
-        post_id = self.kwargs.get('post_id')
-
-        post = get_object_or_404(Post, id=post_id)
-
-        if request.user != post.author:
-            return redirect('blog:post_detail', post_id=post_id)
-        return super().dispatch(request, *args, **kwargs)
-
     def get_success_url(self):
         return reverse_lazy(
             'blog:post_detail',
             kwargs={'post_id': self.object.id})
 
 
-class PostDeleteView(LoginRequiredMixin, DeleteView):
+class PostDeleteView(AuthorRequiredMixin, LoginRequiredMixin, DeleteView):
     model = Post
     template_name = 'blog/create.html'
     form_class = PostForm
@@ -201,15 +284,6 @@ class PostDeleteView(LoginRequiredMixin, DeleteView):
         context['form'] = PostForm(instance=self.object)
         return context
 
-    def dispatch(self, request, *args, **kwargs):
-        post_id = self.kwargs.get('post_id')
-
-        post = get_object_or_404(Post, id=post_id)
-
-        if request.user != post.author:
-            return redirect('blog:post_detail', post_id=post_id)
-        return super().dispatch(request, *args, **kwargs)
-
     def get_success_url(self):
         return reverse_lazy('blog:profile', args=[self.request.user.username])
 
@@ -219,6 +293,7 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
     template_name = 'blog/comment.html'
     form_class = CommentForm
 
+    @transaction.atomic
     def form_valid(self, form):
         form.instance.author = self.request.user
         form.instance.post = get_object_or_404(Post, id=self.kwargs['post_id'])
@@ -232,45 +307,31 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
     def get_success_url(self):
         return reverse_lazy(
             'blog:post_detail',
-            kwargs={'post_id': self.object.post.id})
+            kwargs={'post_id': self.object.post_id})
 
 
-class CommentUpdateView(LoginRequiredMixin, UpdateView):
+class CommentUpdateView(AuthorRequiredMixin, LoginRequiredMixin,
+                        UpdateView):
     model = Comment
     template_name = 'blog/comment.html'
     form_class = CommentForm
     pk_url_kwarg = 'comment_id'
-
-    def dispatch(self, request, *args, **kwargs):
-        comment_id = self.kwargs.get('comment_id')
-
-        comment = get_object_or_404(Comment, id=comment_id)
-
-        if request.user != comment.author:
-            return redirect('blog:post_detail', post_id=comment.post.id)
-        return super().dispatch(request, *args, **kwargs)
+    post_id_attr = 'post_id'
 
     def get_success_url(self):
         return reverse_lazy(
             'blog:post_detail',
-            kwargs={'post_id': self.object.post.id})
+            kwargs={'post_id': self.object.post_id})
 
 
-class CommentDeleteView(LoginRequiredMixin, DeleteView):
+class CommentDeleteView(AuthorRequiredMixin, LoginRequiredMixin,
+                        DeleteView):
     model = Comment
     template_name = 'blog/comment.html'
     pk_url_kwarg = 'comment_id'
-
-    def dispatch(self, request, *args, **kwargs):
-        comment_id = self.kwargs.get('comment_id')
-
-        comment = get_object_or_404(Comment, id=comment_id)
-
-        if request.user != comment.author:
-            return redirect('blog:post_detail', post_id=comment.post.id)
-        return super().dispatch(request, *args, **kwargs)
+    post_id_attr = 'post_id'
 
     def get_success_url(self):
         return reverse(
             'blog:post_detail',
-            kwargs={'post_id': self.object.post.id})
+            kwargs={'post_id': self.object.post_id})
@@ -0,0 +1,49 @@
+import os
+from urllib.parse import urlsplit
+
+# Настройки кэша из окружения:
+#   CACHE_URL  memcached://host:11211[,host2:11211] (нужен pymemcache),
+#              redis://host:6379/0 (нужен django-redis),
+#              file:///abs/path или locmem://.
+# Теги страниц, счётчики и версии карточек сбрасываются через кэш,
+# поэтому он должен быть общим для всех процессов сайта и команд.
+# Без CACHE_URL кэш хранится в файлах: его видят все процессы на одной
+# машине. locmem:// подходит только для одного процесса.
+
+FILE_CACHE_MAX_ENTRIES = 10000
+
+
+def parse_cache_url(url):
+    parts = urlsplit(url)
+    if parts.scheme == 'memcached':
+        return {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': parts.netloc.split(','),
+        }
+    if parts.scheme in ('redis', 'rediss'):
+        return {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': url,
+        }
+    if parts.scheme == 'file':
+        return file_cache(parts.path)
+    if parts.scheme == 'locmem':
+        return {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    raise ValueError(f'Неподдерживаемая схема CACHE_URL: {parts.scheme}')
+
+
+def file_cache(path):
+    # При переполнении FileBasedCache удаляет треть записей наугад,
+    # в том числе версии тегов, поэтому предел поднят.
+    return {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(path),
+        'OPTIONS': {'MAX_ENTRIES': FILE_CACHE_MAX_ENTRIES},
+    }
+
+
+def cache_from_env(default_path, environ=os.environ):
+    url = environ.get('CACHE_URL')
+    if url:
+        return parse_cache_url(url)
+    return file_cache(default_path)
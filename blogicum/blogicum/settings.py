@@ -10,8 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from .caches import cache_from_env
+from .database import database_from_env
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -27,6 +31,10 @@ DEBUG = True
 
 ALLOWED_HOSTS = ['*', 'localhost', '127.0.0.1']
 
+# Канонический адрес сайта для ссылок, которые сохраняются и отдаются
+# всем посетителям (карта сайта).
+BLOG_SITE_URL = os.environ.get('SITE_URL', 'http://localhost:8000')
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -42,6 +50,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.middleware.QueryCountMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -49,6 +58,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'blog.middleware.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'blogicum.urls'
@@ -75,11 +85,35 @@ WSGI_APPLICATION = 'blogicum.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# По умолчанию — SQLite рядом с проектом; DATABASE_URL, DB_CONN_MAX_AGE
+# и DB_POOLED переключают на PostgreSQL (см. blogicum/database.py).
+# Параметры SQLite задаются в blog/db.py; режим WAL для рабочей базы
+# включается настройкой BLOG_SQLITE_JOURNAL_MODE = 'WAL'.
+
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+    'default': database_from_env(BASE_DIR / 'db.sqlite3'),
+}
+
+# REPLICA_DATABASE_URL (и REPLICA_DB_CONN_MAX_AGE, REPLICA_DB_POOLED)
+# подключает реплику для чтения; какие запросы в неё идут, решает
+# blog/routers.py. В тестах реплика — зеркало основной базы.
+if os.environ.get('REPLICA_DATABASE_URL'):
+    DATABASES['replica'] = {
+        **database_from_env(None, prefix='REPLICA_'),
+        'TEST': {'MIRROR': 'default'},
     }
+
+DATABASE_ROUTERS = ['blog.routers.PrimaryReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+# Кэш общий для всех процессов: CACHE_URL задаёт memcached или Redis,
+# по умолчанию — файлы в BASE_DIR / 'cache' (см. blogicum/caches.py).
+
+CACHES = {
+    'default': cache_from_env(BASE_DIR / 'cache'),
 }
 
 
@@ -131,6 +165,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 CSRF_FAILURE_VIEW = "pages.views.csrf_failure"
 
+MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
 LOGIN_REDIRECT_URL = "blog:index"
@@ -13,12 +13,15 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.contrib import admin
-from django.urls import path, include, reverse_lazy
+from django.urls import path, include, re_path, reverse_lazy
 from django.contrib.auth.forms import UserCreationForm
 from django.views.generic.edit import CreateView
 from django.conf import settings
-from django.conf.urls.static import static
+
+from blog.media import serve_media
 
 
 urlpatterns = [
@@ -35,7 +38,16 @@ urlpatterns = [
         ),
         name='registration',
     ),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+
+# Без собственного префикса маршрут медиафайлов перехватил бы все
+# адреса, и вместо обработчика 404 ответ давал бы serve_media.
+if settings.MEDIA_URL.strip('/'):
+    urlpatterns.append(re_path(
+        r'^%s(?P<path>.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')),
+        serve_media,
+        name='media',
+    ))
 
 
 handler404 = 'pages.views.page_not_found'
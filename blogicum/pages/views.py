@@ -4,10 +4,12 @@ from django.views.generic import TemplateView
 
 class AboutView(TemplateView):
     template_name = 'pages/about.html'
+    read_from_replica = True
 
 
 class RulesView(TemplateView):
     template_name = 'pages/rules.html'
+    read_from_replica = True
 
 
 def csrf_failure(request, reason=''):
@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,20 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def sitemap_root(tmp_path, monkeypatch):
+    root = tmp_path / "sitemaps"
+    monkeypatch.setattr("blog.sitemaps.SITEMAP_ROOT", str(root))
+    return root
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -92,6 +107,7 @@ pytest_plugins = [
     "fixtures.locations",
     "fixtures.categories",
     "fixtures.comments",
+    "fixtures.queries",
     "adapters.comment",
 ]
 
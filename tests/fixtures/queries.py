@@ -0,0 +1,48 @@
+from typing import Optional
+from urllib.parse import urlsplit
+
+import pytest
+from django.test import Client
+from django.urls import resolve
+
+from blog.urls import app_name, query_budgets
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def get_query_budget(url: str) -> int:
+    match = resolve(urlsplit(url).path)
+    assert match.app_name == app_name and match.url_name in query_budgets, (
+        f"Для адреса `{url}` в `blog/urls.py` не объявлен бюджет запросов "
+        "в словаре `query_budgets`."
+    )
+    return query_budgets[match.url_name]
+
+
+@pytest.fixture
+def assert_query_budget():
+    def check(
+            client: Client, url: str, method: str = "get",
+            data: Optional[dict] = None, budget: Optional[int] = None):
+        response = getattr(client, method)(url, data or {})
+        stats = response.wsgi_request.query_stats
+        budget = get_query_budget(url) if budget is None else budget
+        if stats.count > budget:
+            repeated = "\n".join(
+                f"{count}x {sql}"
+                for sql, count in stats.repeated_fingerprints.items()
+            )
+            raise QueryBudgetExceeded(
+                f"Запрос `{method.upper()} {url}` выполнил {stats.count} "
+                f"SQL-запросов при бюджете {budget}. Повторяющиеся запросы:"
+                f"\n{repeated or '-'}"
+            )
+        assert not stats.duplicates, (
+            f"Запрос `{method.upper()} {url}` повторно выполняет одинаковые "
+            f"SQL-запросы: {list(stats.duplicates)}"
+        )
+        return response
+
+    return check
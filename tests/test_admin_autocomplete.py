@@ -0,0 +1,92 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def comments(mixer, user, published_category):
+    posts = mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category)
+    authors = mixer.cycle(5).blend("auth.User")
+    return mixer.cycle(10).blend(
+        "blog.Comment", post=mixer.sequence(*posts),
+        author=mixer.sequence(*authors),
+    )
+
+
+def _autocomplete_specs(response):
+    return {
+        spec.field_path: spec for spec in response.context["cl"].filter_specs
+        if hasattr(spec, "widget")
+    }
+
+
+def test_changelist_filters_do_not_load_related_tables(
+        comments, admin_client):
+    response = admin_client.get("/admin/blog/comment/")
+    specs = _autocomplete_specs(response)
+    assert set(specs) == {"author", "post"}
+    assert all(spec.lookup_choices == [] for spec in specs.values()), (
+        "Убедитесь, что фильтры по автору и публикации не загружают все "
+        "связанные объекты."
+    )
+    assert "admin-autocomplete" in response.content.decode()
+
+    author = comments[0].author
+    response = admin_client.get(
+        "/admin/blog/comment/", {"author__id__exact": author.id})
+    result = response.context["cl"].result_list
+    assert {comment.author_id for comment in result} == {author.id}
+    assert (
+        f'<option value="{author.id}" selected>{author.username}</option>'
+        in response.content.decode()
+    )
+
+
+def test_changelist_query_count_does_not_grow(
+        mixer, user, published_category, admin_client):
+    def changelist_queries():
+        with CaptureQueriesContext(connection) as ctx:
+            admin_client.get("/admin/blog/post/")
+        return len(ctx.captured_queries)
+
+    now = timezone.now()
+    mixer.cycle(2).blend(
+        "blog.Post", author=user, category=published_category, pub_date=now)
+    few = changelist_queries()
+    mixer.cycle(20).blend(
+        "blog.Post", author=mixer.blend("auth.User"),
+        category=published_category, pub_date=now)
+    assert changelist_queries() == few, (
+        "Убедитесь, что список публикаций в админке загружает автора, "
+        "категорию и местоположение одним запросом (`list_select_related`)."
+    )
+
+
+def test_change_form_uses_autocomplete(comments, admin_client):
+    comment = comments[0]
+    content = admin_client.get(
+        f"/admin/blog/comment/{comment.id}/change/").content.decode()
+    other = comments[1].author
+    assert f'<option value="{other.id}"' not in content, (
+        "Убедитесь, что форма комментария не выводит всех пользователей "
+        "в выпадающий список."
+    )
+    assert 'data-field-name="author"' in content
+
+
+def test_autocomplete_endpoint_searches_posts(
+        mixer, user, published_category, admin_client):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        title="Уникальный заголовок")
+    response = admin_client.get("/admin/autocomplete/", {
+        "app_label": "blog", "model_name": "comment",
+        "field_name": "post", "term": "уникальн",
+    })
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["results"]] == [
+        str(post.id)]
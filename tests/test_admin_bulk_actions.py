@@ -0,0 +1,149 @@
+import pytest
+from django.contrib.admin import helpers
+from django.contrib.admin.models import DELETION, LogEntry
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from blog import bulk
+from blog.models import Category, Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+POSTS_URL = "/admin/blog/post/"
+
+
+def _action(client, url, action, objects, **extra):
+    return client.post(url, {
+        "action": action,
+        "index": 0,
+        helpers.ACTION_CHECKBOX_NAME: [obj.pk for obj in objects],
+        **extra,
+    })
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    return mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+    )
+
+
+def test_unpublish_action_updates_rows_and_feeds(
+        posts, client, admin_client):
+    first_page = client.get("/").content.decode()
+    assert posts[0].title in first_page
+
+    response = _action(admin_client, POSTS_URL, "unpublish_posts", posts[:2])
+    assert response.status_code == 302
+    assert list(
+        Post.objects.filter(is_published=True).values_list("id", flat=True)
+    ) == [posts[2].id]
+
+    page = client.get("/").content.decode()
+    assert posts[0].title not in page, (
+        "Убедитесь, что массовое снятие с публикации сбрасывает кэш ленты."
+    )
+    assert posts[2].title in page
+
+
+def test_move_to_category_asks_for_category_first(
+        posts, mixer, admin_client):
+    target = mixer.blend("blog.Category", is_published=True)
+
+    response = _action(
+        admin_client, POSTS_URL, "move_posts_to_category", posts[:2])
+    assert response.status_code == 200
+    assert "admin/blog/bulk_field_form.html" in [
+        t.name for t in response.templates]
+    assert Post.objects.filter(category=target).count() == 0
+
+    response = _action(
+        admin_client, POSTS_URL, "move_posts_to_category", posts[:2],
+        apply=1, value=target.pk)
+    assert response.status_code == 302
+    assert set(Post.objects.filter(category=target).values_list(
+        "id", flat=True)) == {posts[0].id, posts[1].id}
+
+
+def test_delete_preview_and_cascade(posts, mixer, user, admin_client):
+    mixer.cycle(4).blend("blog.Comment", post=posts[0], author=user)
+    mixer.blend("blog.Comment", post=posts[2], author=user)
+
+    response = _action(admin_client, POSTS_URL, "delete_selected", posts[:2])
+    assert response.status_code == 200
+    preview = dict(response.context["preview"])
+    assert preview[Post._meta.verbose_name_plural] == 2
+    assert preview[Comment._meta.verbose_name_plural] == 4
+    assert Post.objects.count() == 3
+
+    response = _action(
+        admin_client, POSTS_URL, "delete_selected", posts[:2], apply=1)
+    assert response.status_code == 302
+    assert list(Post.objects.values_list("id", flat=True)) == [posts[2].id]
+    assert Comment.objects.count() == 1
+    assert sorted(
+        LogEntry.objects.filter(action_flag=DELETION)
+        .values_list("object_id", "object_repr")
+    ) == sorted((str(post.pk), post.title) for post in posts[:2]), (
+        "Убедитесь, что массовое удаление записывается в журнал админки."
+    )
+
+
+def test_delete_comments_recounts_posts(posts, mixer, user, admin_client):
+    comments = mixer.cycle(3).blend(
+        "blog.Comment", post=posts[0], author=user)
+
+    response = _action(
+        admin_client, "/admin/blog/comment/", "delete_selected",
+        comments[:2], apply=1)
+    assert response.status_code == 302
+    assert Post.objects.get(pk=posts[0].pk).comment_count == 1
+
+
+def test_delete_category_detaches_posts(posts, published_category,
+                                        admin_client):
+    response = _action(
+        admin_client, "/admin/blog/category/", "delete_selected",
+        [published_category], apply=1)
+    assert response.status_code == 302
+    assert not Category.objects.exists()
+    assert Post.objects.filter(category__isnull=True).count() == 3
+
+
+def test_bulk_update_runs_one_update_per_chunk(posts, monkeypatch):
+    monkeypatch.setattr(bulk, "BULK_CHUNK_SIZE", 2)
+    with CaptureQueriesContext(connection) as ctx:
+        updated = bulk.update_posts(Post.objects.all(), is_published=False)
+    assert updated == 3
+    updates = [
+        q["sql"] for q in ctx.captured_queries
+        if q["sql"].startswith('UPDATE "blog_post"')
+    ]
+    assert len(updates) == 2, (
+        "Убедитесь, что массовое изменение выполняется одним UPDATE "
+        "на пачку записей."
+    )
+
+
+@pytest.mark.parametrize("action", [
+    "unpublish_posts", "publish_posts", "move_posts_to_category",
+    "reassign_post_author",
+])
+def test_view_only_staff_cannot_change_posts(posts, mixer, action):
+    viewer = mixer.blend("auth.User", is_staff=True, is_active=True)
+    viewer.user_permissions.add(
+        Permission.objects.get(codename="view_post"))
+    client = Client()
+    client.force_login(viewer)
+
+    response = _action(client, POSTS_URL, action, posts[:1], apply=1)
+    assert response.status_code == 200, (
+        "Убедитесь, что действия изменения доступны только с правом "
+        "change."
+    )
+    assert Post.objects.filter(is_published=True).count() == 3
+    assert set(Post.objects.values_list("category_id", "author_id")) == {
+        (posts[0].category_id, posts[0].author_id)}
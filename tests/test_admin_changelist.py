@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta
+
+import pytest
+from django.contrib import admin
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def small_pages(monkeypatch):
+    monkeypatch.setattr(admin.site._registry[Post], "list_per_page", 5)
+
+
+def _get(client, url, params=None):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url, params or {})
+    assert response.status_code == 200
+    return response, [q["sql"] for q in ctx.captured_queries]
+
+
+def test_post_changelist_walks_pages_by_cursor(
+        mixer, user, published_category, admin_client, small_pages):
+    now = timezone.now()
+    posts = mixer.cycle(12).blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=(now - timedelta(days=i // 2) for i in range(12)),
+    )
+    expected = [
+        post.id for post in sorted(
+            posts, key=lambda p: (p.pub_date, p.id), reverse=True)
+    ]
+
+    seen = []
+    response, queries = _get(admin_client, "/admin/blog/post/")
+    while True:
+        cl = response.context["cl"]
+        assert cl.result_count == 12
+        assert not any("OFFSET" in sql for sql in queries), (
+            "Убедитесь, что список публикаций в админке листается курсором, "
+            "а не через OFFSET."
+        )
+        seen.extend(post.id for post in cl.result_list)
+        if not cl.next_url:
+            break
+        response, queries = _get(
+            admin_client, "/admin/blog/post/" + cl.next_url)
+        assert not any(sql.startswith("SELECT COUNT(") for sql in queries), (
+            "Убедитесь, что количество записей в админке берётся из кэша."
+        )
+    assert seen == expected
+
+    response, _ = _get(admin_client, "/admin/blog/post/" + cl.previous_url)
+    assert [post.id for post in response.context["cl"].result_list] == (
+        expected[5:10])
+
+
+def test_editable_rows_match_formset(
+        mixer, user, published_category, admin_client, small_pages):
+    mixer.cycle(7).blend(
+        "blog.Post", author=user, category=published_category)
+    cl = _get(admin_client, "/admin/blog/post/")[0].context["cl"]
+    assert [form.instance.pk for form in cl.formset.forms] == [
+        post.pk for post in cl.result_list], (
+        "Убедитесь, что формы list_editable соответствуют строкам страницы."
+    )
+
+
+def test_filter_links_drop_cursor(
+        mixer, user, published_category, admin_client, small_pages):
+    mixer.cycle(7).blend(
+        "blog.Post", author=user, category=published_category)
+    cl = _get(admin_client, "/admin/blog/post/")[0].context["cl"]
+    cl = _get(admin_client, "/admin/blog/post/" + cl.next_url)[0].context[
+        "cl"]
+    assert "after=" not in cl.get_query_string({"is_published__exact": 1})
+
+
+def test_sorting_by_column_falls_back_to_pages(
+        mixer, user, published_category, admin_client, small_pages):
+    mixer.cycle(7).blend(
+        "blog.Post", author=user, category=published_category)
+    response, _ = _get(admin_client, "/admin/blog/post/", {"o": "1"})
+    cl = response.context["cl"]
+    assert cl.keyset_page is None
+    assert len(cl.result_list) == 5
+
+
+def test_date_hierarchy_lists_only_nonempty_periods(
+        mixer, user, published_category, admin_client):
+    dates = [
+        datetime(2020, 5, 1), datetime(2022, 3, 10), datetime(2022, 11, 2),
+        datetime(2022, 11, 20), datetime(2024, 1, 1),
+    ]
+    mixer.cycle(len(dates)).blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=(timezone.make_aware(value) for value in dates),
+    )
+    content = _get(admin_client, "/admin/blog/post/")[0].content.decode()
+    for year in ("2020", "2022", "2024"):
+        assert f"pub_date__year={year}" in content
+    assert "pub_date__year=2021" not in content, (
+        "Убедитесь, что иерархия дат показывает только годы с записями."
+    )
+
+    response, queries = _get(
+        admin_client, "/admin/blog/post/", {"pub_date__year": "2022"})
+    content = response.content.decode()
+    assert "pub_date__month=3" in content
+    assert "pub_date__month=11" in content
+    assert "pub_date__month=4" not in content
+    assert not any("DISTINCT" in sql for sql in queries)
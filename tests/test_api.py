@@ -0,0 +1,111 @@
+import gzip
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import scheduler
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    now = timezone.now()
+    return mixer.cycle(7).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+        pub_date=(now - timedelta(hours=i) for i in range(1, 8)),
+    )
+
+
+def test_feed_returns_selected_fields_by_cursor(posts, client):
+    seen = []
+    url = "/api/posts/?fields=id,title,author&limit=3"
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        for item in data["results"]:
+            assert set(item) == {"id", "title", "author"}
+        seen.extend(item["id"] for item in data["results"])
+        url = data["next"]
+    assert seen == [post.id for post in posts]
+
+    first = client.get("/api/posts/?limit=3").json()
+    second = client.get(first["next"]).json()
+    back = client.get(second["previous"]).json()
+    assert back["results"] == first["results"]
+    assert first["results"][0]["author"] == posts[0].author.username
+
+
+def test_unknown_field_is_rejected(posts, client):
+    response = client.get("/api/posts/?fields=id,password")
+    assert response.status_code == 400
+    assert "password" in response.json()["error"]
+
+
+def test_not_modified_without_queries_until_post_changes(posts, client):
+    response = client.get("/api/posts/")
+    etag = response["ETag"]
+    assert response["Last-Modified"]
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get("/api/posts/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert len(ctx.captured_queries) == 0, (
+        "Убедитесь, что ответ 304 API отдаётся без запросов к базе."
+    )
+
+    posts[0].title = "Новый заголовок"
+    posts[0].save()
+    response = client.get("/api/posts/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.json()["results"][0]["title"] == "Новый заголовок"
+
+
+def test_scheduled_post_changes_etag_when_due(
+        posts, mixer, user, published_category, client):
+    scheduled = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(hours=1))
+    etag = client.get("/api/posts/")["ETag"]
+
+    # Наступление pub_date: без сохранения модели и без таймера.
+    Post.objects.filter(pk=scheduled.pk).update(pub_date=timezone.now())
+    cache.set(
+        scheduler.NEXT_PUBLICATION_KEY, timezone.now().timestamp(), None)
+
+    response = client.get("/api/posts/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.json()["results"][0]["id"] == scheduled.id
+
+
+def test_post_detail_with_comments(posts, mixer, another_user, client):
+    mixer.cycle(2).blend(
+        "blog.Comment", post=posts[0], author=another_user)
+    data = client.get(f"/api/posts/{posts[0].id}/?fields=id,title").json()
+    assert data["post"] == {"id": posts[0].id, "title": posts[0].title}
+    assert [c["author"] for c in data["comments"]] == [
+        another_user.username] * 2
+
+
+def test_hidden_post_is_not_found(posts, client):
+    Post.objects.filter(pk=posts[0].pk).update(is_published=False)
+    response = client.get(f"/api/posts/{posts[0].id}/")
+    assert response.status_code == 404
+    assert response.json()["error"]
+
+
+def test_category_feed_and_gzip(posts, published_category, client):
+    response = client.get(
+        f"/api/category/{published_category.slug}/?limit=50",
+        HTTP_ACCEPT_ENCODING="gzip")
+    assert response["Content-Encoding"] == "gzip"
+    data = json.loads(gzip.decompress(response.content))
+    assert len(data["results"]) == len(posts)
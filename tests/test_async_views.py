@@ -0,0 +1,100 @@
+import asyncio
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import AsyncClient
+from django.urls import path
+from django.views import View
+
+from blog import urls
+from blog.async_views import async_view
+from blog.views import MainPostView, PostDetailView
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+CONCURRENT_REQUESTS = 4
+rendezvous = threading.Barrier(CONCURRENT_REQUESTS, timeout=5)
+
+
+class RendezvousView(View):
+    # Ответ возможен, только когда все запросы одновременно внутри
+    # представления: при последовательном выполнении барьер ломается.
+    def get(self, request):
+        User.objects.exists()
+        rendezvous.wait()
+        return HttpResponse("ok")
+
+
+urlpatterns = [path("rendezvous/", async_view(RendezvousView))]
+
+
+def test_async_view_renders_page_in_thread(
+        mixer, user, published_category, rf):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True)
+    view = async_view(MainPostView)
+    assert asyncio.iscoroutinefunction(view)
+
+    request = rf.get("/")
+    request.user = AnonymousUser()
+    response = async_to_sync(view)(request)
+    assert response.status_code == 200
+    assert post.title in response.content.decode()
+
+
+def test_async_detail_view_lazy_comments_are_rendered(
+        mixer, user, published_category, rf):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True)
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+
+    request = rf.get(f"/posts/{post.id}/")
+    request.user = AnonymousUser()
+    response = async_to_sync(async_view(PostDetailView))(
+        request, post_id=post.id)
+    assert comment.text.splitlines()[0] in response.content.decode()
+
+
+def test_read_view_is_selected_per_url(monkeypatch):
+    monkeypatch.setattr(urls, "ASYNC_VIEWS", {"index"})
+    assert asyncio.iscoroutinefunction(
+        urls.read_view("index", MainPostView))
+    assert not asyncio.iscoroutinefunction(
+        urls.read_view("post_detail", PostDetailView))
+
+
+def test_bench_views_reports_both_modes(
+        mixer, user, published_category, capsys):
+    mixer.blend("blog.Post", author=user, category=published_category)
+    call_command("bench_views", "/", requests=4, concurrency=2)
+    output = capsys.readouterr().out
+    assert "wsgi  /" in output
+    assert "asgi  /" in output
+
+
+def test_async_views_overlap_through_middleware(settings):
+    settings.ROOT_URLCONF = __name__
+    rendezvous.reset()
+    client = AsyncClient()
+
+    async def main():
+        return await asyncio.gather(*(
+            client.get("/rendezvous/")
+            for _ in range(CONCURRENT_REQUESTS)))
+
+    responses = async_to_sync(main)()
+    assert all(response.status_code == 200 for response in responses), (
+        "Убедитесь, что промежуточные слои блога поддерживают асинхронный "
+        "режим и асинхронные представления выполняются параллельно."
+    )
+    for response in responses:
+        assert response.asgi_request.query_stats.count == 1, (
+            "Убедитесь, что запросы к базе из пула потоков попадают "
+            "в статистику запроса."
+        )
@@ -0,0 +1,87 @@
+import pytest
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+    )
+
+
+@pytest.fixture
+def comment(mixer, user, post):
+    return mixer.blend("blog.Comment", post=post, author=user)
+
+
+@pytest.fixture
+def urls(post, comment):
+    return {
+        "edit_post": (f"/posts/{post.id}/edit/", "blog_post", {
+            "title": "Новый заголовок", "text": "Текст",
+            "pub_date": "2020-01-01 10:00", "category": post.category_id,
+        }),
+        "delete_post": (f"/posts/{post.id}/delete/", "blog_post", {}),
+        "edit_comment": (
+            f"/posts/{post.id}/edit_comment/{comment.id}/", "blog_comment",
+            {"text": "Новый текст"}),
+        "delete_comment": (
+            f"/posts/{post.id}/delete_comment/{comment.id}/", "blog_comment",
+            {}),
+    }
+
+
+def _object_fetches(response, table):
+    stats = response.wsgi_request.query_stats
+    return sum(
+        count for sql, count in stats.fingerprints.items()
+        if sql.startswith(f'SELECT "{table}"."id"')
+        and f'WHERE "{table}"."id" = %s' in sql
+    )
+
+
+# Сессия, пользователь, объект; форма публикации добавляет списки
+# категорий и местоположений.
+@pytest.mark.parametrize(("name", "queries"), [
+    ("edit_post", 5),
+    ("delete_post", 3),
+    ("edit_comment", 3),
+    ("delete_comment", 3),
+])
+def test_author_get_fetches_object_once(urls, user_client, name, queries):
+    url, table, _ = urls[name]
+    response = user_client.get(url)
+    assert response.status_code == 200
+    assert _object_fetches(response, table) == 1, (
+        "Убедитесь, что объект загружается один раз и для проверки "
+        "авторства, и для формы."
+    )
+    assert response.wsgi_request.query_stats.count == queries
+
+
+@pytest.mark.parametrize(
+    "name", ["edit_post", "delete_post", "edit_comment", "delete_comment"])
+def test_author_post_fetches_object_once(urls, user_client, name):
+    url, table, data = urls[name]
+    response = user_client.post(url, data)
+    assert response.status_code == 302
+    assert _object_fetches(response, table) == 1, (
+        "Убедитесь, что при отправке формы объект загружается один раз."
+    )
+
+
+@pytest.mark.parametrize(
+    "name", ["edit_post", "delete_post", "edit_comment", "delete_comment"])
+@pytest.mark.parametrize("method", ["get", "post"])
+def test_non_author_is_redirected_to_post(
+        urls, post, comment, another_user_client, name, method):
+    url, _, data = urls[name]
+    response = getattr(another_user_client, method)(url, data)
+    assert response.status_code == 302
+    assert response["Location"] == f"/posts/{post.id}/"
+    assert Post.objects.get(pk=post.pk).title == post.title
+    assert Comment.objects.get(pk=comment.pk).text == comment.text
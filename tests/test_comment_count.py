@@ -0,0 +1,86 @@
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    return mixer.cycle(2).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+    )
+
+
+def _counts(*posts):
+    return [Post.objects.get(pk=post.pk).comment_count for post in posts]
+
+
+def test_comment_views_adjust_count(posts, user_client):
+    post = posts[0]
+    for text in ("Первый", "Второй"):
+        response = user_client.post(
+            f"/posts/{post.id}/comment/", data={"text": text})
+        assert response.status_code == 302
+    assert _counts(post) == [2], (
+        "Убедитесь, что создание комментария увеличивает comment_count."
+    )
+
+    comment = Comment.objects.filter(post=post).first()
+    response = user_client.post(
+        f"/posts/{post.id}/delete_comment/{comment.id}/")
+    assert response.status_code == 302
+    assert _counts(post) == [1], (
+        "Убедитесь, что удаление комментария уменьшает comment_count."
+    )
+
+
+def test_admin_delete_adjusts_count(posts, mixer, user, admin_client):
+    comments = mixer.cycle(2).blend("blog.Comment", post=posts[0],
+                                    author=user)
+    response = admin_client.post(
+        f"/admin/blog/comment/{comments[0].id}/delete/", {"post": "yes"})
+    assert response.status_code == 302
+    assert _counts(posts[0]) == [1]
+
+
+def test_cascade_delete_leaves_other_posts(posts, mixer, user):
+    mixer.cycle(3).blend("blog.Comment", post=posts[0], author=user)
+    mixer.blend("blog.Comment", post=posts[1], author=user)
+
+    posts[0].delete()
+    assert Comment.objects.count() == 1
+    assert _counts(posts[1]) == [1]
+
+
+def test_moving_comment_adjusts_both_posts(posts, mixer, user):
+    comment = mixer.blend("blog.Comment", post=posts[0], author=user)
+    assert _counts(*posts) == [1, 0]
+
+    comment.post = posts[1]
+    comment.save()
+    assert _counts(*posts) == [0, 1], (
+        "Убедитесь, что перенос комментария меняет comment_count обеих "
+        "публикаций."
+    )
+
+
+def test_recount_comments_dry_run_and_repair(posts, mixer, user, capsys):
+    mixer.cycle(2).blend("blog.Comment", post=posts[0], author=user)
+    Post.objects.filter(pk=posts[0].pk).update(comment_count=7)
+    Post.objects.filter(pk=posts[1].pk).update(comment_count=3)
+
+    call_command("recount_comments", "--dry-run", batch_size=1)
+    assert "Найдено расхождений: 2" in capsys.readouterr().out
+    assert _counts(*posts) == [7, 3], (
+        "Убедитесь, что `recount_comments --dry-run` ничего не меняет."
+    )
+
+    call_command("recount_comments", batch_size=1)
+    assert "Исправлено расхождений: 2" in capsys.readouterr().out
+    assert _counts(*posts) == [2, 0]
+
+    call_command("recount_comments")
+    assert "Исправлено расхождений: 0" in capsys.readouterr().out
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import counters
+from blog.models import Post
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    return response, [
+        q["sql"] for q in ctx.captured_queries if q["sql"].startswith("SELECT COUNT(")
+    ]
+
+
+def test_feed_count_is_cached_and_invalidated(
+        mixer, user, published_category, user_client):
+    mixer.cycle(N_PER_PAGE + 1).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now(),
+    )
+
+    response, counts = _count_queries(user_client, "/")
+    assert response.context["page_obj"].paginator.count == N_PER_PAGE + 1
+    assert len(counts) == 1
+
+    response, counts = _count_queries(user_client, "/")
+    assert response.context["page_obj"].paginator.count == N_PER_PAGE + 1
+    assert not counts, (
+        "Убедитесь, что количество публикаций ленты берётся из кэша и "
+        "не пересчитывается при каждом запросе."
+    )
+
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now(),
+    )
+    response, counts = _count_queries(user_client, "/")
+    assert response.context["page_obj"].paginator.count == N_PER_PAGE + 2, (
+        "Убедитесь, что кэшированное количество публикаций сбрасывается "
+        "при сохранении публикации."
+    )
+
+
+class FakePostgresCursor:
+    def __init__(self, plan):
+        self.plan = plan
+        self.executed = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql, params):
+        self.executed.append((sql, params))
+
+    def fetchone(self):
+        return (self.plan,)
+
+
+class FakePostgresConnection:
+    vendor = "postgresql"
+
+    def __init__(self, plan):
+        self.cursor_instance = FakePostgresCursor(plan)
+
+    def cursor(self):
+        return self.cursor_instance
+
+
+@pytest.mark.parametrize("decode", [False, True])
+def test_feed_count_estimate_reads_postgres_plan(monkeypatch, decode):
+    # psycopg2 отдаёт столбец json уже разобранным, другие драйверы —
+    # строкой.
+    plan = [{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 12345}}]
+    fake = FakePostgresConnection(json.dumps(plan) if decode else plan)
+    monkeypatch.setattr(counters, "connections", {"default": fake})
+    monkeypatch.setattr(counters, "FEED_COUNT_ESTIMATE", True)
+    monkeypatch.setattr(counters, "FEED_COUNT_ESTIMATE_MIN", 100)
+
+    queryset = Post.objects.filter(title="Заголовок")
+    assert counters.get_feed_count("published", queryset) == 12345
+    (sql, params), = fake.cursor_instance.executed
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert params == ("Заголовок",)
+    assert counters.get_feed_count("published", queryset) == 12345
+    assert len(fake.cursor_instance.executed) == 1
@@ -0,0 +1,116 @@
+from datetime import timedelta
+from xml.etree import ElementTree
+
+import pytest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from blog import feeds
+
+pytestmark = [pytest.mark.django_db]
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    now = timezone.now()
+    return mixer.cycle(5).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+        pub_date=(now - timedelta(hours=i) for i in range(1, 6)),
+    )
+
+
+def _content(response):
+    assert isinstance(response, StreamingHttpResponse), (
+        "Убедитесь, что лента отдаётся потоковым ответом."
+    )
+    return b"".join(response.streaming_content)
+
+
+def test_rss_lists_visible_posts_newest_first(
+        posts, mixer, user, published_category, client):
+    hidden = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(days=1))
+    response = client.get("/feed/rss/")
+    assert response["Content-Type"].startswith("application/rss+xml")
+    root = ElementTree.fromstring(_content(response))
+    titles = [item.findtext("title") for item in root.iter("item")]
+    assert titles == [post.title for post in posts]
+    assert hidden.title not in titles
+
+
+def test_category_atom_feed_is_valid(posts, published_category, client):
+    response = client.get(f"/category/{published_category.slug}/feed/atom/")
+    root = ElementTree.fromstring(_content(response))
+    assert root.findtext(f"{ATOM}title").endswith(published_category.title)
+    assert len(root.findall(f"{ATOM}entry")) == len(posts)
+
+
+def test_large_feed_is_sent_in_chunks(posts, client, monkeypatch):
+    monkeypatch.setattr(feeds, "FEED_CHUNK_SIZE", 1)
+    response = client.get("/feed/rss/")
+    chunks = list(response.streaming_content)
+    assert len(chunks) > len(posts)
+    ElementTree.fromstring(b"".join(chunks))
+
+
+def test_conditional_requests(posts, client):
+    response = client.get("/feed/atom/")
+    etag = response["ETag"]
+    last_modified = response["Last-Modified"]
+
+    assert client.get(
+        "/feed/atom/", HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert client.get(
+        "/feed/atom/", HTTP_IF_MODIFIED_SINCE=last_modified
+    ).status_code == 304
+
+    posts[2].text = "Исправленный текст"
+    posts[2].save()
+    assert client.get(
+        "/feed/atom/", HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+def test_profile_feed_and_unknown_format(posts, user, client):
+    response = client.get(f"/profile/{user.username}/feed/rss/")
+    assert response.status_code == 200
+    assert client.get(
+        f"/profile/{user.username}/feed/json/").status_code == 404
+
+
+def test_renaming_category_or_author_changes_etag(
+        posts, user, published_category, client):
+    urls = ["/feed/rss/", f"/category/{published_category.slug}/feed/atom/"]
+    etags = [client.get(url)["ETag"] for url in urls]
+    published_category.title = "Новое название"
+    published_category.save()
+    for url, etag in zip(urls, etags):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            "Убедитесь, что переименование категории меняет ETag ленты."
+        )
+        assert "Новое название".encode() in _content(response)
+
+    etag = client.get("/feed/rss/")["ETag"]
+    user.username = "new_author_name"
+    user.save()
+    response = client.get("/feed/rss/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что переименование автора меняет ETag ленты."
+    )
+    assert b"new_author_name" in _content(response)
+
+
+def test_feed_rows_are_fetched_inside_the_view(posts, client):
+    response = client.get("/feed/rss/")
+    selects = [
+        sql for sql in response.wsgi_request.query_stats.fingerprints
+        if 'FROM "blog_post"' in sql and "LIMIT" in sql
+    ]
+    assert selects, (
+        "Убедитесь, что записи ленты выбираются до отдачи потока и "
+        "учитываются в статистике запроса."
+    )
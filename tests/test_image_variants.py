@@ -0,0 +1,138 @@
+from io import BytesIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+from PIL import Image
+
+from blog.models import ImageJob, Post
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+EXIF_ORIENTATION = 0x0112
+EXIF_MAKE = 0x010F
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def _upload(width, height, orientation=None):
+    exif = Image.Exif()
+    exif[EXIF_MAKE] = "Camera"
+    if orientation:
+        exif[EXIF_ORIENTATION] = orientation
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), color=(73, 109, 137)).save(
+        buffer, format="JPEG", exif=exif)
+    return SimpleUploadedFile(
+        "photo.jpg", buffer.getvalue(), content_type="image/jpeg")
+
+
+def _create_post(client, category, image):
+    response = client.post("/posts/create/", {
+        "title": "С фото",
+        "text": "Текст",
+        "pub_date": timezone.now().strftime("%Y-%m-%dT%H:%M"),
+        "category": category.id,
+        "is_published": True,
+        "image": image,
+    })
+    assert response.status_code == 302
+    return Post.objects.get(title="С фото")
+
+
+def test_upload_is_processed_by_worker(
+        user_client, published_category, media_root):
+    # Ориентация 6: снимок нужно повернуть на 90°, 1000x2000 -> 2000x1000.
+    post = _create_post(
+        user_client, published_category, _upload(1000, 2000, orientation=6))
+    assert post.image_variants == {"pending": True}
+    assert ImageJob.objects.get(post=post).status == ImageJob.PENDING
+    content = user_client.get(f"/posts/{post.id}/").content.decode()
+    assert "Фото обрабатывается" in content, (
+        "Убедитесь, что до обработки фото вместо него выводится заглушка."
+    )
+
+    call_command("process_image_jobs", "--once", "--workers", "1")
+
+    post.refresh_from_db()
+    assert ImageJob.objects.get(post=post).status == ImageJob.DONE
+    info = post.image_variants
+    assert (info["width"], info["height"]) == (2000, 1000)
+    assert [v["width"] for v in info["variants"]] == [320, 640, 960, 1280]
+    for variant in info["variants"]:
+        with Image.open(media_root / variant["name"]) as image:
+            assert image.size == (variant["width"], variant["height"])
+            assert not image.getexif()
+    with Image.open(media_root / post.image.name) as original:
+        assert original.size == (2000, 1000)
+        assert not original.getexif(), (
+            "Убедитесь, что из исходного фото удаляются EXIF-метаданные."
+        )
+
+    img = BeautifulSoup(
+        user_client.get(f"/posts/{post.id}/").content.decode(),
+        features="html.parser",
+    ).find("img", srcset=True)
+    assert img is not None, (
+        "Убедитесь, что изображение публикации выводится с атрибутом "
+        "`srcset` из уменьшенных копий."
+    )
+    assert img["width"] == "2000" and img["height"] == "1000"
+    variant_640 = next(v for v in info["variants"] if v["width"] == 640)
+    assert img["src"].endswith(variant_640["name"])
+
+
+def test_failed_job_falls_back_to_original(
+        user_client, published_category, media_root):
+    post = _create_post(user_client, published_category, _upload(800, 400))
+    (media_root / post.image.name).write_bytes(b"not an image")
+    for _ in range(3):
+        call_command("process_image_jobs", "--once", "--workers", "1")
+
+    post.refresh_from_db()
+    job = ImageJob.objects.get(post=post)
+    assert job.status == ImageJob.FAILED
+    assert post.image_variants == {}
+
+
+def test_admin_image_change_is_processed(
+        user_client, admin_client, published_category, media_root):
+    post = _create_post(user_client, published_category, _upload(800, 400))
+    call_command("process_image_jobs", "--once", "--workers", "1")
+    post.refresh_from_db()
+    old_variants = post.image_variants["variants"]
+
+    response = admin_client.post(f"/admin/blog/post/{post.id}/change/", {
+        "title": post.title,
+        "text": post.text,
+        "pub_date_0": post.pub_date.strftime("%Y-%m-%d"),
+        "pub_date_1": post.pub_date.strftime("%H:%M:%S"),
+        "author": post.author_id,
+        "category": post.category_id,
+        "is_published": "on",
+        "image": _upload(1000, 500),
+    })
+    assert response.status_code == 302
+    post.refresh_from_db()
+    assert post.image_variants == {"pending": True}, (
+        "Убедитесь, что при замене фото в админке копии прежнего фото "
+        "сбрасываются."
+    )
+    assert ImageJob.objects.filter(
+        post=post, status=ImageJob.PENDING).count() == 1
+
+    call_command("process_image_jobs", "--once", "--workers", "1")
+    post.refresh_from_db()
+    assert post.image_variants["width"] == 1000
+    assert post.image_variants["variants"] != old_variants
+    with Image.open(media_root / post.image.name) as original:
+        assert not original.getexif(), (
+            "Убедитесь, что фото, загруженное через админку, очищается "
+            "от EXIF-метаданных."
+        )
@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category):
+    now = timezone.now()
+    # Пары публикаций с одинаковой датой проверяют разрешение по id.
+    pub_dates = (
+        now - timedelta(hours=i // 2) for i in range(N_PER_PAGE * 2 + 5)
+    )
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        "blog.Post",
+        author=user,
+        is_published=True,
+        category=published_category,
+        pub_date=pub_dates,
+    )
+
+
+def _walk(client, url):
+    seen = []
+    response = client.get(url)
+    while True:
+        page_obj = response.context["page_obj"]
+        seen.extend(post.id for post in page_obj)
+        if not page_obj.has_next():
+            return seen, page_obj
+        response = client.get(url, {"after": page_obj.next_cursor})
+
+
+def test_keyset_walks_feed_without_gaps(feed_posts, client):
+    seen, last_page = _walk(client, "/")
+    expected = [
+        post.id for post in sorted(
+            feed_posts, key=lambda p: (p.pub_date, p.id), reverse=True
+        )
+    ]
+    assert seen == expected, (
+        "Убедитесь, что при переходе по курсорам `?after=` главная страница "
+        "показывает каждую публикацию ровно один раз и в порядке убывания "
+        "даты публикации."
+    )
+    assert last_page.has_previous()
+
+    response = client.get("/", {"before": last_page.previous_cursor})
+    page_obj = response.context["page_obj"]
+    assert [post.id for post in page_obj] == expected[
+        N_PER_PAGE:N_PER_PAGE * 2
+    ], (
+        "Убедитесь, что курсор `?before=` возвращает предыдущую страницу."
+    )
+
+
+def test_keyset_ignores_broken_cursor(feed_posts, client):
+    response = client.get("/", {"after": "not-a-cursor"})
+    assert response.status_code == 200
+    assert len(response.context["page_obj"]) == N_PER_PAGE
@@ -0,0 +1,63 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.models import MediaBlob
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def _photo(name):
+    buffer = BytesIO()
+    Image.new("RGB", (50, 50), color=(10, 20, 30)).save(
+        buffer, format="JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+def _files(root):
+    return sorted(p for p in (root / "images").rglob("*") if p.is_file())
+
+
+def test_identical_uploads_are_stored_once(
+        mixer, user, published_category, media_root):
+    first, second = mixer.cycle(2).blend(
+        "blog.Post", author=user, category=published_category,
+        image=mixer.sequence(_photo("a.jpg"), _photo("b.jpg")),
+    )
+    assert first.image.name == second.image.name, (
+        "Убедитесь, что одинаковые фото сохраняются в один файл."
+    )
+    assert len(_files(media_root)) == 1
+    assert MediaBlob.objects.get(name=first.image.name).refcount == 2
+
+
+def test_collect_media_removes_only_unreferenced_files(
+        mixer, user, published_category, media_root):
+    first, second = mixer.cycle(2).blend(
+        "blog.Post", author=user, category=published_category,
+        image=mixer.sequence(_photo("a.jpg"), _photo("b.jpg")),
+    )
+    orphan = media_root / "images" / "00" / "00" / "orphan.jpg"
+    orphan.parent.mkdir(parents=True)
+    orphan.write_bytes(b"orphan")
+
+    first.delete()
+    call_command("collect_media", "--grace", "0")
+    assert _files(media_root) == [media_root / second.image.name], (
+        "Убедитесь, что collect_media удаляет файлы без ссылок и оставляет "
+        "используемые."
+    )
+
+    second.delete()
+    call_command("collect_media", "--grace", "0")
+    assert _files(media_root) == []
+    assert not MediaBlob.objects.exists()
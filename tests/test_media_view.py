@@ -0,0 +1,104 @@
+import pytest
+from django.urls import Resolver404, resolve
+from pytest_django.asserts import assertTemplateUsed
+
+from blog import media
+
+HASHED = "ab" * 32
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def media_files(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    (tmp_path / "images").mkdir()
+    (tmp_path / "images" / f"{HASHED}.jpg").write_bytes(CONTENT)
+    (tmp_path / "images" / "legacy.jpg").write_bytes(CONTENT)
+    return tmp_path
+
+
+def _body(response):
+    return b"".join(response.streaming_content)
+
+
+def test_media_full_response_and_revalidation(media_files, client):
+    response = client.get(f"/media/images/{HASHED}.jpg")
+    assert response.status_code == 200
+    assert _body(response) == CONTENT
+    assert response["ETag"] == f'"{HASHED}"'
+    assert response["Accept-Ranges"] == "bytes"
+    assert "immutable" in response["Cache-Control"], (
+        "Убедитесь, что файлы с хешем в имени кэшируются бессрочно."
+    )
+
+    response = client.get(
+        f"/media/images/{HASHED}.jpg", HTTP_IF_NONE_MATCH=f'"{HASHED}"')
+    assert response.status_code == 304, (
+        "Убедитесь, что при совпадении `If-None-Match` возвращается 304."
+    )
+
+    legacy = client.get("/media/images/legacy.jpg")
+    assert "immutable" not in legacy["Cache-Control"]
+    response = client.get(
+        "/media/images/legacy.jpg",
+        HTTP_IF_MODIFIED_SINCE=legacy["Last-Modified"])
+    assert response.status_code == 304
+
+
+@pytest.mark.parametrize(
+    "header, start, end",
+    [("bytes=0-9", 0, 9), ("bytes=1000-", 1000, 1023),
+     ("bytes=-24", 1000, 1023), ("bytes=1020-5000", 1020, 1023)],
+)
+def test_media_range_requests(media_files, client, header, start, end):
+    response = client.get(f"/media/images/{HASHED}.jpg", HTTP_RANGE=header)
+    assert response.status_code == 206
+    assert _body(response) == CONTENT[start:end + 1]
+    assert response["Content-Range"] == f"bytes {start}-{end}/1024"
+    assert response["Content-Length"] == str(end - start + 1)
+
+
+def test_media_unsatisfiable_and_stale_ranges(media_files, client):
+    response = client.get(
+        f"/media/images/{HASHED}.jpg", HTTP_RANGE="bytes=2000-")
+    assert response.status_code == 416
+    assert response["Content-Range"] == "bytes */1024"
+
+    response = client.get(
+        f"/media/images/{HASHED}.jpg", HTTP_RANGE="bytes=0-9",
+        HTTP_IF_RANGE='"stale"')
+    assert response.status_code == 200, (
+        "Убедитесь, что при несовпадении `If-Range` файл отдаётся целиком."
+    )
+
+
+def test_media_rejects_missing_and_traversal(media_files, client):
+    assert client.get("/media/images/missing.jpg").status_code == 404
+    assert client.get("/media/images/").status_code == 404
+    assert client.get("/media/images/../../etc/passwd").status_code == 404
+
+
+@pytest.mark.django_db
+def test_other_paths_are_not_served_as_media(media_files, client):
+    with pytest.raises(Resolver404):
+        resolve("/images/legacy.jpg")
+    response = client.get("/images/legacy.jpg")
+    assert response.status_code == 404
+    assertTemplateUsed(response, "pages/404.html")
+
+
+@pytest.mark.parametrize(
+    "mode, header, value",
+    [("x-accel-redirect", "X-Accel-Redirect",
+      f"/protected-media/images/{HASHED}.jpg"),
+     ("x-sendfile", "X-Sendfile", None)],
+)
+def test_media_sendfile_offload(
+        media_files, client, monkeypatch, mode, header, value):
+    monkeypatch.setattr(media, "MEDIA_SENDFILE", mode)
+    response = client.get(f"/media/images/{HASHED}.jpg")
+    assert response.status_code == 200
+    assert response.content == b""
+    expected = value or str(media_files / "images" / f"{HASHED}.jpg")
+    assert response[header] == expected
+    assert response["ETag"] == f'"{HASHED}"'
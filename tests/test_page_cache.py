@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.cache import check_shared_cache, page_cache_key
+from blog.scheduler import seconds_until_next_publication
+from blogicum.caches import cache_from_env
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def visible_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(hours=1),
+    )
+
+
+def _get(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    return response, len(ctx.captured_queries)
+
+
+def test_anonymous_pages_are_cached(visible_post, client):
+    for url in ("/", f"/posts/{visible_post.id}/",
+                f"/category/{visible_post.category.slug}/",
+                f"/profile/{visible_post.author.username}/"):
+        first, _ = _get(client, url)
+        second, queries = _get(client, url)
+        assert second.status_code == 200
+        assert second.content == first.content
+        assert queries == 0, (
+            f"Убедитесь, что страница `{url}` для анонимного пользователя "
+            "отдаётся из кэша без запросов к базе данных."
+        )
+
+
+def test_authenticated_requests_bypass_cache(visible_post, user_client):
+    _get(user_client, "/")
+    _, queries = _get(user_client, "/")
+    assert queries > 0
+
+
+def test_comment_invalidates_detail_page(
+        visible_post, client, another_user_client):
+    url = f"/posts/{visible_post.id}/"
+    client.get(url)
+    another_user_client.post(
+        f"/posts/{visible_post.id}/comment/", {"text": "Свежий комментарий"})
+    assert "Свежий комментарий" in client.get(url).content.decode(), (
+        "Убедитесь, что кэш страницы публикации сбрасывается после "
+        "добавления комментария."
+    )
+
+
+def test_scheduled_post_limits_cache_lifetime(visible_post, mixer):
+    assert seconds_until_next_publication() is None
+    mixer.blend(
+        "blog.Post", author=visible_post.author,
+        category=visible_post.category, is_published=True,
+        pub_date=timezone.now() + timedelta(minutes=2),
+    )
+    assert 0 < seconds_until_next_publication() <= 120, (
+        "Убедитесь, что время жизни кэша страниц ограничено моментом "
+        "выхода ближайшей отложенной публикации."
+    )
+
+
+def test_page_cache_key_ignores_unrelated_params(rf):
+    assert page_cache_key(rf.get("/", {"utm_source": "x"})) == (
+        page_cache_key(rf.get("/"))
+    )
+    assert page_cache_key(rf.get("/", {"after": "a"})) != (
+        page_cache_key(rf.get("/"))
+    )
+
+
+def test_cache_is_shared_between_processes(tmp_path, settings):
+    assert settings.CACHES["default"]["BACKEND"].endswith(
+        "FileBasedCache"), (
+        "Убедитесь, что без CACHE_URL кэш общий для всех процессов."
+    )
+    assert cache_from_env(tmp_path, environ={}) == {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": str(tmp_path),
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }
+    memcached = cache_from_env("unused", environ={
+        "CACHE_URL": "memcached://cache1:11211,cache2:11211"})
+    assert memcached["LOCATION"] == ["cache1:11211", "cache2:11211"]
+
+    assert check_shared_cache(None) == []
+    settings.CACHES = {"default": cache_from_env(
+        "unused", environ={"CACHE_URL": "locmem://"})}
+    assert [warning.id for warning in check_shared_cache(None)] == [
+        "blog.W001"]
@@ -0,0 +1,42 @@
+import pytest
+from django.utils import timezone
+
+from blog.models import Category, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def cached_card(mixer, user, published_category, user_client):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now(), title="Старый заголовок",
+    )
+    assert "Старый заголовок" in user_client.get("/").content.decode()
+    return post
+
+
+def test_post_card_is_served_from_cache(cached_card, user_client):
+    Post.objects.filter(pk=cached_card.pk).update(title="Без сигнала")
+    assert "Старый заголовок" in user_client.get("/").content.decode(), (
+        "Убедитесь, что карточка публикации берётся из кэша фрагментов."
+    )
+
+
+def test_post_card_invalidated_on_post_save(cached_card, user_client):
+    cached_card.title = "Новый заголовок"
+    cached_card.save()
+    content = user_client.get("/").content.decode()
+    assert "Новый заголовок" in content, (
+        "Убедитесь, что кэш карточки сбрасывается при сохранении публикации."
+    )
+
+
+def test_post_card_invalidated_on_category_save(cached_card, user_client):
+    category = Category.objects.get(pk=cached_card.category_id)
+    category.title = "Переименованная категория"
+    category.save()
+    content = user_client.get("/").content.decode()
+    assert "Переименованная категория" in content, (
+        "Убедитесь, что кэш карточки сбрасывается при сохранении категории."
+    )
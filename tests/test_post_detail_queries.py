@@ -0,0 +1,51 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+# Сессия и пользователь + публикация + комментарии.
+AUTHENTICATED_DETAIL_QUERIES = 4
+# Публикация + комментарии + ближайшая отложенная публикация
+# для времени жизни кэша страницы.
+ANONYMOUS_DETAIL_QUERIES = 3
+
+
+@pytest.fixture
+def commented_post(mixer, user, another_user, published_category,
+                   published_location):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location, is_published=True,
+        pub_date=timezone.now() - timedelta(hours=1),
+    )
+    mixer.cycle(5).blend(
+        "blog.Comment", post=post, author=mixer.sequence(user, another_user))
+    return post
+
+
+@pytest.mark.parametrize("client_name, expected", [
+    ("user_client", AUTHENTICATED_DETAIL_QUERIES),
+    ("another_user_client", AUTHENTICATED_DETAIL_QUERIES),
+    ("unlogged_client", ANONYMOUS_DETAIL_QUERIES),
+])
+def test_post_detail_query_count(
+        request, commented_post, django_assert_num_queries,
+        client_name, expected):
+    client = request.getfixturevalue(client_name)
+    with django_assert_num_queries(expected):
+        response = client.get(f"/posts/{commented_post.id}/")
+    assert response.status_code == 200
+    assert len(response.context["comments"]) == 5
+
+
+def test_unpublished_post_visible_only_to_author(
+        commented_post, user_client, another_user_client,
+        django_assert_num_queries):
+    commented_post.is_published = False
+    commented_post.save()
+    url = f"/posts/{commented_post.id}/"
+    with django_assert_num_queries(AUTHENTICATED_DETAIL_QUERIES):
+        assert user_client.get(url).status_code == 200
+    assert another_user_client.get(url).status_code == 404
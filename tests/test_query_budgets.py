@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.urls import query_budgets, urlpatterns
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def populated_blog(mixer, user, another_user, published_category,
+                   published_locations):
+    posts = mixer.cycle(15).blend(
+        "blog.Post", author=user, category=published_category,
+        location=mixer.sequence(*published_locations), is_published=True,
+        pub_date=timezone.now() - timedelta(hours=1),
+    )
+    comments = mixer.cycle(5).blend(
+        "blog.Comment", post=posts[0],
+        author=mixer.sequence(user, another_user),
+    )
+    return posts[0], comments[0]
+
+
+@pytest.fixture
+def urls(populated_blog, user, published_category):
+    post, comment = populated_blog
+    return {
+        "index": "/",
+        "post_detail": f"/posts/{post.id}/",
+        "category_posts": f"/category/{published_category.slug}/",
+        "profile": f"/profile/{user.username}/",
+        "search": f"/search/?q={post.title.split()[0]}",
+        "create_post": "/posts/create/",
+        "edit_profile": "/edit_profile/",
+        "edit_post": f"/posts/{post.id}/edit/",
+        "delete_post": f"/posts/{post.id}/delete/",
+        "add_comment": f"/posts/{post.id}/comment/",
+        "edit_comment": f"/posts/{post.id}/edit_comment/{comment.id}/",
+        "delete_comment": f"/posts/{post.id}/delete_comment/{comment.id}/",
+        "api_index": "/api/posts/",
+        "api_post": f"/api/posts/{post.id}/",
+        "api_category": f"/api/category/{published_category.slug}/",
+        "api_profile": f"/api/profile/{user.username}/",
+        "feed": "/feed/rss/",
+        "category_feed": f"/category/{published_category.slug}/feed/atom/",
+        "profile_feed": f"/profile/{user.username}/feed/rss/",
+        "sitemap": "/sitemap.xml",
+        "sitemap_shard": (
+            f"/sitemap/{published_category.id}/"
+            f"{timezone.localtime(post.pub_date):%Y-%m}.xml"
+        ),
+    }
+
+
+def test_every_url_declares_budget():
+    names = {pattern.name for pattern in urlpatterns}
+    assert names == set(query_budgets), (
+        "Убедитесь, что для каждого адреса в `blog/urls.py` объявлен бюджет "
+        "запросов в словаре `query_budgets`."
+    )
+
+
+@pytest.mark.parametrize("name", sorted(query_budgets))
+@pytest.mark.parametrize("client_name", ["user_client", "unlogged_client"])
+def test_get_within_query_budget(
+        request, urls, assert_query_budget, name, client_name):
+    client = request.getfixturevalue(client_name)
+    assert_query_budget(client, urls[name])
+
+
+def test_add_comment_within_query_budget(
+        urls, another_user_client, assert_query_budget):
+    response = assert_query_budget(
+        another_user_client, urls["add_comment"], method="post",
+        data={"text": "Комментарий"},
+    )
+    assert response.status_code == 302
+
+
+def test_server_timing_header_in_debug(urls, user_client):
+    with override_settings(DEBUG=True):
+        response = user_client.get(urls["index"])
+    assert response["Server-Timing"].startswith("db;dur="), (
+        "Убедитесь, что в режиме отладки ответ содержит заголовок "
+        "`Server-Timing` со статистикой SQL-запросов."
+    )
+    assert "Server-Timing" not in user_client.get(urls["index"])
@@ -0,0 +1,73 @@
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from blog.models import Comment
+from blog.paginators import KeysetPaginator
+from blog.views import get_posts_with_filters
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != "sqlite",
+        reason="EXPLAIN QUERY PLAN доступен только в SQLite",
+    ),
+]
+
+
+def _feed_page(queryset, after=None):
+    paginator = KeysetPaginator(queryset, 10)
+    queryset = paginator._ordered()
+    if after is not None:
+        queryset = queryset.filter(paginator._seek(after, "lt"))
+    return queryset[:11]
+
+
+def _assert_uses_index(queryset, index_name, feed):
+    plan = queryset.explain()
+    assert f"USING INDEX {index_name}" in plan, (
+        f"Убедитесь, что запрос ленты `{feed}` использует индекс "
+        f"`{index_name}`. План запроса:\n{plan}"
+    )
+    assert "SCAN blog_post" not in plan, (
+        f"Запрос ленты `{feed}` полностью просматривает таблицу публикаций."
+        f" План запроса:\n{plan}"
+    )
+    assert "TEMP B-TREE" not in plan, (
+        f"Запрос ленты `{feed}` сортирует публикации во временном индексе."
+        f" План запроса:\n{plan}"
+    )
+
+
+@pytest.mark.parametrize("after", [None, (timezone.now(), 100)])
+def test_feed_queries_use_indexes(user, published_category, after):
+    _assert_uses_index(
+        _feed_page(get_posts_with_filters(), after),
+        "post_published_feed_idx", "главная",
+    )
+    _assert_uses_index(
+        _feed_page(
+            get_posts_with_filters(published_category.post_set.all()),
+            after),
+        "post_category_feed_idx", "категория",
+    )
+    _assert_uses_index(
+        _feed_page(get_posts_with_filters(user.posts.all()), after),
+        "post_author_feed_idx", "профиль",
+    )
+    _assert_uses_index(
+        _feed_page(
+            get_posts_with_filters(user.posts.all(), apply_filters=False),
+            after),
+        "post_author_feed_idx", "профиль автора",
+    )
+
+
+def test_post_comments_query_uses_index():
+    plan = Comment.objects.filter(post_id=1).select_related(
+        "author").explain()
+    assert "USING INDEX comment_post_created_idx" in plan, (
+        "Убедитесь, что комментарии публикации выбираются по индексу "
+        f"`comment_post_created_idx`. План запроса:\n{plan}"
+    )
+    assert "TEMP B-TREE" not in plan
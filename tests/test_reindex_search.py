@@ -0,0 +1,105 @@
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog import search
+from blog.models import Post, SearchIndexState
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _found(query):
+    backend = search.get_search_backend()
+    return set(
+        backend.filter(Post.objects.all(), query)
+        .values_list("id", flat=True)
+    )
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    return mixer.cycle(5).blend(
+        "blog.Post", author=user, category=published_category,
+        text="обычный текст",
+    )
+
+
+def test_comment_text_is_searchable(posts, mixer, user):
+    comment = mixer.blend(
+        "blog.Comment", post=posts[0], author=user, text="кукушка")
+    assert _found("кукушка") == {posts[0].id}, (
+        "Убедитесь, что текст комментариев попадает в поисковый индекс."
+    )
+    comment.delete()
+    assert _found("кукушка") == set()
+
+
+def test_incremental_reindex_picks_up_bulk_updates(posts):
+    call_command("reindex_search")
+    Post.objects.filter(pk=posts[0].pk).update(
+        text="дятел", updated_at=timezone.now())
+    assert _found("дятел") == set()
+
+    call_command("reindex_search", "--incremental")
+    assert _found("дятел") == {posts[0].id}, (
+        "Убедитесь, что `reindex_search --incremental` переиндексирует "
+        "публикации, изменённые после прошлого прохода."
+    )
+
+
+def test_incremental_reindex_picks_up_comment_changes(
+        posts, mixer, user, monkeypatch):
+    comment = mixer.blend(
+        "blog.Comment", post=posts[0], author=user, text="синица")
+    removed = mixer.blend(
+        "blog.Comment", post=posts[1], author=user, text="снегирь")
+    call_command("reindex_search")
+
+    # Изменения мимо живого индекса: их подхватывает только проход.
+    backend = search.get_search_backend()
+    monkeypatch.setattr(backend, "index_posts", lambda post_ids: None)
+    comment.text = "зяблик"
+    comment.save()
+    removed.delete()
+    monkeypatch.undo()
+    assert _found("зяблик") == set()
+    assert _found("снегирь") == {posts[1].id}
+
+    call_command("reindex_search", "--incremental")
+    assert _found("зяблик") == {posts[0].id}, (
+        "Убедитесь, что `reindex_search --incremental` переиндексирует "
+        "публикации с изменёнными комментариями."
+    )
+    assert _found("снегирь") == set(), (
+        "Убедитесь, что `reindex_search --incremental` учитывает удалённые "
+        "комментарии."
+    )
+
+
+def test_reindex_resumes_from_checkpoint(posts, monkeypatch):
+    backend = search.get_search_backend()
+    index_posts = backend.index_posts
+    batches = []
+
+    def interrupted(post_ids):
+        if batches:
+            raise RuntimeError("прервано")
+        batches.append(list(post_ids))
+        index_posts(post_ids)
+
+    monkeypatch.setattr(backend, "index_posts", interrupted)
+    with pytest.raises(RuntimeError):
+        call_command("reindex_search", "--batch-size", "2")
+    state = SearchIndexState.objects.get()
+    assert state.last_id == batches[0][-1]
+
+    monkeypatch.setattr(
+        backend, "index_posts",
+        lambda post_ids: batches.append(list(post_ids)))
+    call_command("reindex_search", "--batch-size", "2")
+    assert sum(batches, []) == sorted(post.id for post in posts), (
+        "Убедитесь, что прерванная переиндексация продолжается с "
+        "контрольной точки."
+    )
+    state.refresh_from_db()
+    assert state.run_started_at is None and state.indexed_until
@@ -0,0 +1,155 @@
+import sqlite3
+import time
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext
+
+from blog.cache import _tag_key
+from blog.middleware import REPLICA_PIN_COOKIE
+from blog.models import Post
+from blog.routers import PrimaryReplicaRouter, current_request
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture
+def replica(tmp_path, settings):
+    # Реплика — второй файл SQLite; «репликация» — копия основной базы
+    # через backup(), вызываемая тестом в нужный момент.
+    path = str(tmp_path / "replica.sqlite3")
+    connections.settings["replica"] = {
+        **connections["default"].settings_dict, "NAME": path}
+    settings.BLOG_DB_REPLICAS = ["replica"]
+
+    def replicate():
+        connections["default"].ensure_connection()
+        target = sqlite3.connect(path)
+        connections["default"].connection.backup(target)
+        target.close()
+
+    yield replicate
+    connections["replica"].close()
+    del connections["replica"]
+    del connections.settings["replica"]
+
+
+@pytest.fixture
+def post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, title="Заголовок с реплики")
+
+
+def _lag_behind(post):
+    Post.objects.filter(pk=post.pk).update(title="Правка в основной базе")
+
+
+def _settle(*tags):
+    # Изменения по тегам давно дошли до реплики: версии старше
+    # допустимого отставания.
+    old = f"{time.time_ns() - 600 * 10**9:x}:{uuid4().hex}"
+    cache.set_many({_tag_key(tag): old for tag in tags}, None)
+
+
+def test_read_views_use_replica(replica, post, client):
+    replica()
+    _lag_behind(post)
+    with CaptureQueriesContext(connections["default"]) as primary:
+        with CaptureQueriesContext(connections["replica"]) as copy:
+            response = client.get(f"/posts/{post.id}/")
+    assert "Заголовок с реплики" in response.content.decode(), (
+        "Убедитесь, что страница публикации читается из реплики."
+    )
+    assert copy.captured_queries and not primary.captured_queries
+
+    for path in ("/", "/feed/rss/", "/api/posts/", "/pages/about/"):
+        assert client.get(path).status_code == 200
+
+
+def test_asgi_request_uses_replica(replica, post):
+    replica()
+    _lag_behind(post)
+    response = async_to_sync(AsyncClient().get)(f"/posts/{post.id}/")
+    assert "Заголовок с реплики" in response.content.decode()
+
+
+def test_recent_change_is_not_cached_from_replica(replica, post, client):
+    replica()
+    post.title = "Правка в основной базе"
+    post.save()
+
+    content = client.get(f"/posts/{post.id}/").content.decode()
+    assert "Заголовок с реплики" in content
+    data = client.get(f"/api/posts/{post.id}/").json()
+    assert data["post"]["title"] == "Правка в основной базе", (
+        "Убедитесь, что ответ с ETag по недавно сброшенным тегам "
+        "читается из основной базы."
+    )
+
+    replica()
+    content = client.get(f"/posts/{post.id}/").content.decode()
+    assert "Правка в основной базе" in content, (
+        "Убедитесь, что страница, собранная из отстающей реплики, "
+        "не попадает в кэш под новыми версиями тегов."
+    )
+
+
+def test_unrelated_writes_keep_reads_on_replica(
+        replica, post, mixer, user, published_category, client):
+    replica()
+    _settle(f"post:{post.id}", "cards")
+    mixer.blend("blog.Post", author=user, category=published_category)
+    user.last_login = None
+    user.save()
+    _lag_behind(post)
+
+    data = client.get(f"/api/posts/{post.id}/").json()
+    assert data["post"]["title"] == "Заголовок с реплики", (
+        "Убедитесь, что запись в другие публикации не переводит чтение "
+        "всех посетителей на основную базу."
+    )
+
+
+def test_author_reads_own_writes(replica, post, user_client):
+    replica()
+    response = user_client.post(
+        f"/posts/{post.id}/comment/", data={"text": "Свежий комментарий"})
+    assert response.status_code == 302
+    assert REPLICA_PIN_COOKIE in response.cookies
+
+    content = user_client.get(f"/posts/{post.id}/").content.decode()
+    assert "Свежий комментарий" in content, (
+        "Убедитесь, что после записи чтения посетителя закрепляются "
+        "за основной базой."
+    )
+    content = Client().get(f"/posts/{post.id}/").content.decode()
+    assert "Свежий комментарий" not in content
+
+
+def test_admin_reads_from_primary(replica, post, mixer, client):
+    admin = mixer.blend(
+        "auth.User", is_staff=True, is_superuser=True, is_active=True)
+    client.force_login(admin)
+    replica()
+    _lag_behind(post)
+    response = client.get("/admin/blog/post/")
+    assert "Правка в основной базе" in response.content.decode()
+
+
+def test_writes_and_transactions_use_primary(replica):
+    router = PrimaryReplicaRouter()
+    token = current_request.set(SimpleNamespace(read_from_replica=True))
+    try:
+        assert router.db_for_read(Post) == "replica"
+        assert router.db_for_write(Post) == "default"
+        with transaction.atomic():
+            assert router.db_for_read(Post) == "default"
+    finally:
+        current_request.reset(token)
+    assert router.db_for_read(Post) == "default"
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from blog.scheduler import post_became_visible, release_due_posts, safe_ttl
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(minutes=5),
+    )
+
+
+def test_safe_ttl_is_capped_by_next_publication(scheduled_post):
+    assert safe_ttl(3600) <= 300
+    assert safe_ttl(60) == 60
+
+
+def test_release_due_posts_sends_signal(scheduled_post):
+    received = []
+
+    def receiver(sender, posts, **kwargs):
+        received.extend(posts)
+
+    post_became_visible.connect(receiver)
+    try:
+        assert release_due_posts() == []
+
+        later = timezone.now() + timedelta(minutes=10)
+        assert release_due_posts(now=later) == [scheduled_post]
+        assert received == [scheduled_post], (
+            "Убедитесь, что при наступлении pub_date отправляется сигнал "
+            "`post_became_visible`."
+        )
+        assert release_due_posts(now=later) == []
+    finally:
+        post_became_visible.disconnect(receiver)
+
+
+def test_publish_scheduled_requires_shared_cache(scheduled_post, settings,
+                                                 capsys):
+    call_command("publish_scheduled")
+    assert "Опубликовано по расписанию: 0" in capsys.readouterr().out
+
+    settings.CACHES = {"default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    with pytest.raises(CommandError):
+        call_command("publish_scheduled")
@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def make(title, text, **kwargs):
+        fields = dict(
+            author=user, category=published_category, is_published=True,
+            pub_date=timezone.now() - timedelta(minutes=1),
+        )
+        fields.update(kwargs)
+        return mixer.blend("blog.Post", title=title, text=text, **fields)
+    return make
+
+
+def _found(client, query, **params):
+    response = client.get("/search/", {"q": query, **params})
+    assert response.status_code == 200
+    return response, [post.id for post in response.context["page_obj"]]
+
+
+def test_search_respects_visibility(
+        make_post, client, mixer, published_category):
+    visible = make_post("Котики", "Рассказ про пушистых котиков")
+    make_post("Котики", "Черновик про котиков", is_published=False)
+    make_post(
+        "Котики", "Отложенный пост про котиков",
+        pub_date=timezone.now() + timedelta(days=1))
+    hidden_category = mixer.blend("blog.Category", is_published=False)
+    make_post("Котики", "Котики в скрытой категории",
+              category=hidden_category)
+    make_post("Собаки", "Совсем о другом")
+
+    response, found = _found(client, "котик")
+    assert found == [visible.id], (
+        "Убедитесь, что поиск находит только опубликованные публикации, "
+        "как и ленты."
+    )
+    assert "<mark>" in response.content.decode(), (
+        "Убедитесь, что совпадения в сниппете выделяются тегом `<mark>`."
+    )
+
+
+def test_search_ranks_and_escapes_snippets(make_post, client):
+    weak = make_post("Заметка", "Один раз упомянули кофе <b>жирно</b>")
+    strong = make_post("Кофе", "Кофе, кофе и снова кофе")
+    response, found = _found(client, "кофе")
+    assert found == [strong.id, weak.id], (
+        "Убедитесь, что результаты поиска отсортированы по релевантности."
+    )
+    content = response.content.decode()
+    assert "<b>жирно</b>" not in content
+    assert "&lt;b&gt;жирно&lt;/b&gt;" in content
+
+
+def test_search_ignores_query_syntax(make_post, client):
+    make_post("Запрос", "Обычный текст")
+    for query in ['"', "AND OR NOT", "title:*", "(("]:
+        _found(client, query)
+
+
+def test_search_index_follows_post_changes(make_post, client):
+    post = make_post("Старое", "Старый текст")
+    post.title = "Новое"
+    post.text = "Новый текст"
+    post.save()
+    assert _found(client, "старый")[1] == []
+    assert _found(client, "новый")[1] == [post.id]
+    post.delete()
+    assert _found(client, "новый")[1] == []
+
+
+def test_search_cursor_pagination_keeps_query(make_post, client):
+    posts = [
+        make_post(f"Пост {i}", "чай " * (i + 1))
+        for i in range(N_PER_PAGE + 3)
+    ]
+    make_post("Другое", "кофе")
+    response, first = _found(client, "чай")
+    page_obj = response.context["page_obj"]
+    assert len(first) == N_PER_PAGE and page_obj.has_next()
+    assert "q=%D1%87%D0%B0%D0%B9&after=" in response.content.decode()
+
+    response, second = _found(client, "чай", after=page_obj.next_cursor)
+    assert sorted(first + second) == sorted(post.id for post in posts), (
+        "Убедитесь, что курсорная пагинация поиска показывает каждую "
+        "найденную публикацию ровно один раз."
+    )
+
+
+def test_admin_search_uses_index(make_post, admin_client):
+    post = make_post("Админка", "Искомое слово")
+    make_post("Прочее", "Ничего общего")
+    response = admin_client.get("/admin/blog/post/", {"q": "искомое"})
+    assert [obj.id for obj in response.context["cl"].result_list] == [
+        post.id]
+
+
+def test_search_pages_run_no_count(make_post, client):
+    for i in range(N_PER_PAGE + 3):
+        make_post(f"Пост {i}", "чай")
+    response, found = _found(client, "чай")
+    assert len(found) == N_PER_PAGE
+    counts = [
+        sql for sql in response.wsgi_request.query_stats.fingerprints
+        if sql.startswith("SELECT COUNT(")
+    ]
+    assert not counts, (
+        "Убедитесь, что страница поиска не считает точное число "
+        "совпадений: курсорная пагинация обходится без COUNT."
+    )
+    assert "Публикаций:" not in response.content.decode()
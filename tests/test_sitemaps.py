@@ -0,0 +1,147 @@
+import threading
+from datetime import datetime
+from xml.etree import ElementTree
+
+import pytest
+from django.utils import timezone
+
+from blog.sitemaps import SITE_URL, _write_atomic
+
+pytestmark = [pytest.mark.django_db]
+
+NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+
+def _aware(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    return mixer.cycle(4).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+        pub_date=mixer.sequence(
+            _aware(2023, 1, 5), _aware(2023, 1, 20),
+            _aware(2023, 2, 1), _aware(2023, 2, 28, 23, 30)),
+    )
+
+
+def _xml(response):
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/xml"
+    return ElementTree.fromstring(b"".join(response.streaming_content))
+
+
+def _shard_files(root):
+    return sorted(path for path in root.rglob("*.xml") if "index" not in
+                  path.name)
+
+
+def test_index_lists_category_month_shards(
+        posts, published_category, client):
+    root = _xml(client.get("/sitemap.xml"))
+    locations = [el.findtext(f"{NS}loc") for el in root.iter(f"{NS}sitemap")]
+    assert locations == [
+        f"{SITE_URL}/sitemap/{published_category.id}/2023-1.xml",
+        f"{SITE_URL}/sitemap/{published_category.id}/2023-2.xml",
+    ]
+
+
+def test_shard_lists_posts_with_lastmod(posts, published_category, client):
+    root = _xml(client.get(f"/sitemap/{published_category.id}/2023-1.xml"))
+    urls = list(root.iter(f"{NS}url"))
+    assert [url.findtext(f"{NS}loc") for url in urls] == [
+        f"{SITE_URL}/posts/{post.id}/" for post in posts[:2]]
+    assert all(url.findtext(f"{NS}lastmod") for url in urls)
+
+
+def test_only_changed_shard_is_regenerated(
+        posts, published_category, client, sitemap_root):
+    january = f"/sitemap/{published_category.id}/2023-1.xml"
+    february = f"/sitemap/{published_category.id}/2023-2.xml"
+    client.get(january)
+    client.get(february)
+    before = _shard_files(sitemap_root)
+    assert len(before) == 2
+
+    posts[2].title = "Новый заголовок"
+    posts[2].save()
+    client.get(january)
+    client.get(february)
+    after = _shard_files(sitemap_root)
+    assert len(after) == 2
+    assert before[0] in after, (
+        "Убедитесь, что неизменённая часть карты сайта не пересобирается."
+    )
+    assert before[1] not in after
+
+
+def test_moved_post_invalidates_old_and_new_shard(
+        posts, published_category, client):
+    shard = f"/sitemap/{published_category.id}/2023-1.xml"
+    client.get(shard)
+    posts[0].pub_date = _aware(2022, 12, 1)
+    posts[0].save()
+    root = _xml(client.get(shard))
+    assert len(list(root.iter(f"{NS}url"))) == 1
+
+
+def test_empty_or_invalid_shard_is_not_found(
+        posts, published_category, client, sitemap_root):
+    assert client.get(
+        f"/sitemap/{published_category.id}/2024-1.xml").status_code == 404
+    assert client.get(
+        f"/sitemap/{published_category.id}/2023-13.xml").status_code == 404
+    assert not _shard_files(sitemap_root)
+
+
+def test_conditional_get(posts, client):
+    response = client.get("/sitemap.xml")
+    assert client.get(
+        "/sitemap.xml", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    ).status_code == 304
+
+
+def test_locations_ignore_request_host(posts, published_category, client):
+    root = _xml(client.get(
+        "/sitemap.xml", HTTP_HOST="attacker.example", secure=True))
+    locations = [el.findtext(f"{NS}loc") for el in root.iter(f"{NS}sitemap")]
+    assert all(loc.startswith(f"{SITE_URL}/") for loc in locations), (
+        "Убедитесь, что адреса карты сайта строятся из BLOG_SITE_URL, "
+        "а не из заголовка Host запроса."
+    )
+    root = _xml(client.get(
+        f"/sitemap/{published_category.id}/2023-1.xml",
+        HTTP_HOST="attacker.example"))
+    assert "attacker.example" not in ElementTree.tostring(root).decode()
+
+
+def test_concurrent_writes_do_not_share_temporary_file(tmp_path):
+    path = str(tmp_path / "shard.0123456789abcdef.xml")
+    barrier = threading.Barrier(4)
+    errors = []
+
+    def target():
+        try:
+            _write_atomic(path, write)
+        except Exception as error:
+            errors.append(error)
+
+    def write(handler):
+        barrier.wait(timeout=5)
+        for number in range(200):
+            handler.addQuickElement("loc", str(number))
+
+    threads = [threading.Thread(target=target) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    content = open(path, encoding="utf-8").read()
+    assert content.count("<loc>199</loc>") == 1, (
+        "Убедитесь, что потоки пишут карту через разные временные файлы."
+    )
+    assert [item.name for item in tmp_path.iterdir()] == [
+        "shard.0123456789abcdef.xml"]